@@ -4,7 +4,7 @@ import { pipeline } from "@xenova/transformers";
 
 //import all_schemes model
 import AllScheme from "../models/all_schemes.model.js";
-import { vectorSearch } from "../utils/searchSchemes.js";
+import { vectorSearch, listSchemes } from "../utils/searchSchemes.js";
 
 // Load the embedder once (reuse it across requests)
 let embedder;
@@ -488,6 +488,25 @@ export const searchSchemes = async (req, res) => {
 			.json({ message: "Failed to search schemes", error: error.message });
 	}
 };
+
+/* CATALOGUE: the unique_schemes collection searchSchemes runs on, with embeddings */
+export const getSchemeCatalogue = async (req, res) => {
+	try {
+		const page = parseInt(req.query.page || "1", 10) || 1;
+		const limit = Math.min(parseInt(req.query.limit || "100", 10) || 100, 500);
+		const { schemes, total } = await listSchemes(page, limit);
+		res.json({
+			schemes,
+			totalPages: Math.ceil(total / limit),
+			currentPage: page,
+			total,
+		});
+	} catch (error) {
+		res
+			.status(500)
+			.json({ message: "Failed to fetch scheme catalogue", error: error.message });
+	}
+};
 // Add these functions to your scheme.controller.js
 
 export const createScheme_all = async (req, res) => {
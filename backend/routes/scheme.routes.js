@@ -12,6 +12,7 @@ import {
 	addToFavorites,
 	removeFromFavorites,
 	saveUserInteraction,
+	getSchemeCatalogue,
 } from "../controllers/scheme.controller.js";
 import {
 	authenticateToken,
@@ -23,6 +24,7 @@ const router = express.Router();
 // Public routes
 router.get("/", getAllSchemes);
 router.post("/search", searchSchemes);
+router.get("/catalogue", getSchemeCatalogue);
 router.get("/:id", getSchemeById);
 
 // Protected routes
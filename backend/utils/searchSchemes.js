@@ -64,3 +64,25 @@ export async function vectorSearch(queryText) {
 		await client.close();
 	}
 }
+
+// Page through the same collection vectorSearch queries (for the FastAPI local index)
+export async function listSchemes(page, limit) {
+	// Own client: vectorSearch closes the shared one when it finishes
+	const listClient = new MongoClient(uri);
+	try {
+		await listClient.connect();
+		const collection = listClient.db("MyScheme").collection("unique_schemes");
+		const [schemes, total] = await Promise.all([
+			collection
+				.find({})
+				.sort({ _id: 1 }) // stable order across pages
+				.skip((page - 1) * limit)
+				.limit(limit)
+				.toArray(),
+			collection.countDocuments(),
+		]);
+		return { schemes, total };
+	} finally {
+		await listClient.close();
+	}
+}
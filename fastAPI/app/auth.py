@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer
 import os
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Use same JWT secret as your JavaScript backend
 JWT_SECRET = os.getenv("JWT_SECRET", "JanSethu_jwt_secret_key_2024")
@@ -45,6 +46,21 @@ def verify_user_only(user_data: dict = Depends(verify_token)):
         )
     return user_data["user_id"]
 
+def verify_official(user_data: dict = Depends(verify_token)):
+    """Ensure only 'govt_official' role can access (admin/maintenance endpoints)"""
+    if user_data["role"] != "govt_official":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only government officials can perform this action"
+        )
+    return user_data["user_id"]
+
 def get_current_user(user_data: dict = Depends(verify_token)):
     """Get current authenticated user ID"""
     return user_data["user_id"]
+
+def get_optional_user(token=Depends(optional_security)):
+    """User ID from a bearer token if one was sent; anonymous callers get None"""
+    if token is None:
+        return None
+    return verify_token(token)["user_id"]
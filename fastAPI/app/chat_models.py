@@ -26,6 +26,13 @@ class ChatResponse(BaseModel):
     confidence_score: Optional[float] = None
     response_time: Optional[float] = None
     
+class ChatBatchRequest(BaseModel):
+    requests: List[ChatRequest]
+
+class ChatBatchResponse(BaseModel):
+    responses: List[ChatResponse]
+    response_time: Optional[float] = None
+    
 class FormAnalysis(BaseModel):
     fields: List[Dict]
     suggestions: Dict
@@ -38,6 +45,7 @@ class ConversationContext(BaseModel):
     session_id: str
     user_id: Optional[str] = None
     conversation_history: List[Dict] = Field(default_factory=list)
+    summary: Optional[str] = None
     current_intent: Optional[str] = None
     extracted_entities: Dict = Field(default_factory=dict)
     user_preferences: Dict = Field(default_factory=dict)
@@ -5,24 +5,43 @@ from nltk.corpus import stopwords
 import nltk
 from nltk.stem.porter import PorterStemmer
 import warnings
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi import FastAPI
 from pydantic import BaseModel
-from app.utils.translator import translate_text
+from typing import List, Optional
+from app.utils.translator import translate_batch, resolve_lang, choose_profile, DECODING_PROFILES
+from app.utils.translator import registry as translation_registry, preload_models as preload_translation_models
 import os
+import json
+import time
+import asyncio
 from dotenv import load_dotenv
 
 from app.routes import document, ocr
+from app.auth import verify_official, get_current_user, get_optional_user
 
 
 # Import AI/ML services only
-from app.chat_models import ChatRequest, ChatResponse
+from app.chat_models import ChatRequest, ChatResponse, ChatBatchRequest, ChatBatchResponse
 from app.services.ocr_service import OCRService
 from app.services.translation_service import TranslationService
-from app.services.tts_service import TTSService
+from app.services.tts_service import TTSService, TTSTextTooLong
+from app.services.tts_executor import TTSOverloaded
+from app.services.audio_profiles import AUDIO_PROFILES
 from app.services.rag_service import RAGService
+from app.services.response_cache import ResponseCache, cache_key
+from app.services.single_flight import SingleFlight
+from app.services.translation_batcher import TranslationBatcher
+from app.services.translation_cache import get_translation_cache
+from app.services.translation_workers import TranslationWorkerPool
+from app.services.session_store import create_session_store
+from app.services.intent_router import IntentRouter
+from app.services.scheme_index import SchemeIndex
+from app.utils.embedder import embed_text, embed_texts
+from app.utils.http_client import close_http_client
 
 load_dotenv()
 warnings.filterwarnings("ignore")
@@ -46,7 +65,96 @@ app.include_router(ocr.router)
 ocr_service = OCRService()
 translation_service = TranslationService()
 tts_service = TTSService()
-rag_service = RAGService()
+scheme_index = None
+if os.getenv("SCHEME_INDEX_ENABLED", "true").lower() == "true":
+    scheme_index = SchemeIndex(embed_fn=embed_text, embed_batch_fn=embed_texts)
+rag_service = RAGService(scheme_index=scheme_index)
+
+# Chat response cache (semantic tier is opt-in: it loads an embedding model)
+chat_cache_embed_fn = None
+if os.getenv("CHAT_CACHE_SEMANTIC", "false").lower() == "true":
+    chat_cache_embed_fn = embed_text
+chat_cache = ResponseCache(embed_fn=chat_cache_embed_fn)
+
+# Identical concurrent LLM calls (announcement bursts) share one upstream request
+llm_flight = SingleFlight()
+
+# Batch chat: request size cap and a process-wide bound on concurrent LLM calls
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", 100))
+chat_batch_semaphore = asyncio.Semaphore(int(os.getenv("CHAT_BATCH_CONCURRENCY", 8)))
+
+# IndicTrans requests are micro-batched into padded generate calls, run either in
+# this process or on a pool of dedicated worker processes (TRANSLATION_WORKERS > 0)
+translation_pool = None
+if int(os.getenv("TRANSLATION_WORKERS", 0)) > 0:
+    translation_pool = TranslationWorkerPool()
+    translation_batcher = TranslationBatcher(
+        translation_pool.translate_batch, resolve_lang, choose_profile,
+        workers=translation_pool.num_workers * 2
+    )
+    translation_service.local_translate_batch = translation_pool.translate_batch
+else:
+    preload_translation_models()
+    translation_batcher = TranslationBatcher(translate_batch, resolve_lang, choose_profile)
+
+# Per-session conversation memory for follow-up questions
+session_store = create_session_store()
+
+# Local intent router: FAQ/status/scheme-lookup queries answered without the LLM
+intent_router = None
+if os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true":
+    try:
+        intent_router = IntentRouter(scheme_index=scheme_index)
+    except Exception as e:
+        print(f"❌ Intent router unavailable: {e}")
+
+if scheme_index is not None:
+    # Cached answers may cite schemes that just changed
+    scheme_index.on_change(chat_cache.invalidate)
+
+@app.on_event("startup")
+def start_translation_pool():
+    if translation_pool is not None:
+        translation_pool.start()
+
+@app.on_event("startup")
+def start_scheme_index():
+    """Serve from the last snapshot immediately, then keep it fresh from the backend"""
+    if scheme_index is None:
+        return
+    scheme_index.load()
+    scheme_index.start_background_refresh()
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    if scheme_index is not None:
+        scheme_index.stop()
+    if translation_pool is not None:
+        await run_in_threadpool(translation_pool.stop)
+    await close_http_client()
+
+async def _cache_lookup(query, language):
+    """(cached answer or None, query embedding to pass to _cache_put)"""
+    if chat_cache.embed_fn is None:
+        return chat_cache.lookup(query, language)
+    return await run_in_threadpool(chat_cache.lookup, query, language)
+
+async def _cache_put(query, language, value, version, vector=None):
+    if chat_cache.embed_fn is None:
+        return chat_cache.put(query, language, value, version=version)
+    return await run_in_threadpool(chat_cache.put, query, language, value, version, vector)
+
+async def _session_call(fn, *args):
+    """Memory-only stores are instant; a persistent backend does disk I/O"""
+    if session_store.backend is None:
+        return fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+async def _session_history(session_id):
+    if not session_id:
+        return ""
+    context = await _session_call(session_store.get, session_id)
+    return session_store.history_text(context)
 
 @app.get("/")
 def root():
@@ -54,24 +162,260 @@ def root():
 
 # Keep only AI/ML related endpoints
 @app.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, user_id: Optional[str] = Depends(get_optional_user)):
     """Enhanced chat endpoint with smart features"""
     try:
         print(f"Received chat request: {request.message} in {request.language}")
-        response = rag_service.search_schemes(request.message, request.language)
+        start = time.perf_counter()
+
+        history_text = await _session_history(request.session_id)
+        routed = _route_locally(request, history_text)
+        if routed:
+            cached = routed
+        elif history_text:
+            # Follow-ups depend on the conversation, so they bypass the shared cache
+            cached = await _answer_chat(request.message, request.language, history_text)
+        else:
+            cached, vector = await _cache_lookup(request.message, request.language)
+            if cached is None:
+                cached = await llm_flight.do(
+                    ("chat", cache_key(request.message, request.language)),
+                    _answer_chat, request.message, request.language, cache_vector=vector
+                )
+
+        if request.session_id:
+            await _session_call(
+                session_store.append_turn, request.session_id, request.message,
+                cached["response"], request.chat_type.value if request.chat_type else None, user_id
+            )
+
         return ChatResponse(
-            response=response,
+            response=cached["response"],
             audio_url=None,
-            suggested_actions=[],
-            confidence_score=0.85
+            suggested_actions=cached.get("suggested_actions", []),
+            related_schemes=cached["related_schemes"],
+            confidence_score=cached.get("confidence", 0.85),
+            response_time=round(time.perf_counter() - start, 4)
         )
     except Exception as e:
         print(f"Chat error: {e}")
         return ChatResponse(response="Service temporarily unavailable", audio_url=None)
 
+def _route_locally(request, history_text):
+    """Templated answer from the intent router, or None to use the LLM"""
+    # Follow-ups ("and for my mother?") need the conversation, which templates ignore
+    if intent_router is None or history_text:
+        return None
+    try:
+        return intent_router.route(request.message, request.language)
+    except Exception as e:
+        print(f"Intent routing failed: {e}")
+        return None
+
+_NOT_FETCHED = object()
+
+async def _answer_chat(message, language, history_text=None, schemes=_NOT_FETCHED, cache_vector=None):
+    """Retrieve + generate one chat answer; context-free answers are cached.
+
+    `schemes` lets batch callers pass results from one vectorized retrieval pass;
+    `cache_vector` is the query embedding from the cache lookup that missed.
+    """
+    cache_version = chat_cache.version
+    if schemes is _NOT_FETCHED:
+        prompt, related_schemes = await rag_service.prepare_search_async(message, language, history_text)
+    else:
+        prompt, related_schemes = rag_service.build_search_prompt(message, language, schemes, history_text)
+    answer = {"response": await rag_service.generate_async(prompt), "related_schemes": related_schemes}
+    if not history_text:
+        await _cache_put(message, language, answer, cache_version, cache_vector)
+    return answer
+
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, user_id: Optional[str] = Depends(get_optional_user)):
+    """Stream the chat answer as Server-Sent Events.
+
+    `token` events carry text as it is generated; a final `done` event carries the
+    ChatResponse metadata (related_schemes, confidence_score, response_time).
+    """
+    async def events():
+        start = time.perf_counter()
+        try:
+            history_text = await _session_history(request.session_id)
+            cached, vector = _route_locally(request, history_text), None
+            if cached is None and not history_text:
+                cached, vector = await _cache_lookup(request.message, request.language)
+            if cached is None:
+                cache_version = chat_cache.version
+                prompt, related_schemes = await rag_service.prepare_search_async(
+                    request.message, request.language, history_text
+                )
+                parts = []
+                async for text in rag_service.generate_stream_async(prompt):
+                    parts.append(text)
+                    yield _sse("token", {"text": text})
+                cached = {"response": "".join(parts), "related_schemes": related_schemes}
+                if not history_text:
+                    await _cache_put(request.message, request.language, cached, cache_version, vector)
+            else:
+                yield _sse("token", {"text": cached["response"]})
+
+            if request.session_id:
+                await _session_call(
+                    session_store.append_turn, request.session_id, request.message,
+                    cached["response"], request.chat_type.value if request.chat_type else None, user_id
+                )
+
+            final = ChatResponse(
+                response=cached["response"],
+                suggested_actions=cached.get("suggested_actions", []),
+                related_schemes=cached["related_schemes"],
+                confidence_score=cached.get("confidence", 0.85),
+                response_time=round(time.perf_counter() - start, 4)
+            )
+            yield _sse("done", final.model_dump(exclude={"response"}))
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield _sse("error", {"detail": "Service temporarily unavailable"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/chat/batch")
+async def chat_batch(
+    batch: ChatBatchRequest, stream: bool = False, user_id: Optional[str] = Depends(get_optional_user)
+):
+    """Answer many chat requests in one call (kiosks, partner integrations).
+
+    Routed and cached items are answered immediately; the rest share one
+    vectorized retrieval pass and then go to the LLM with bounded concurrency.
+    Returns responses in request order, or with `?stream=true` NDJSON lines
+    `{"index": i, ...ChatResponse}` as each item completes.
+    """
+    requests_ = batch.requests
+    if len(requests_) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(requests_)} items (max {CHAT_BATCH_MAX_ITEMS})"
+        )
+    start = time.perf_counter()
+
+    histories = await asyncio.gather(*(_session_history(r.session_id) for r in requests_))
+    answers = [None] * len(requests_)
+    vectors = [None] * len(requests_)
+    for i, request in enumerate(requests_):
+        answers[i] = _route_locally(request, histories[i])
+        if answers[i] is None and not histories[i]:
+            answers[i], vectors[i] = await _cache_lookup(request.message, request.language)
+    pending = [i for i, answer in enumerate(answers) if answer is None]
+
+    async def finish(i, answer):
+        request = requests_[i]
+        if request.session_id:
+            await _session_call(
+                session_store.append_turn, request.session_id, request.message,
+                answer["response"], request.chat_type.value if request.chat_type else None, user_id
+            )
+        return i, ChatResponse(
+            response=answer["response"],
+            suggested_actions=answer.get("suggested_actions", []),
+            related_schemes=answer["related_schemes"],
+            confidence_score=answer.get("confidence", 0.85),
+            response_time=round(time.perf_counter() - start, 4)
+        )
+
+    async def generate(i, schemes):
+        request = requests_[i]
+        try:
+            async with chat_batch_semaphore:
+                if histories[i]:
+                    answer = await _answer_chat(request.message, request.language, histories[i], schemes)
+                else:
+                    # Duplicates inside the batch (and across requests) share one LLM call
+                    answer = await llm_flight.do(
+                        ("chat", cache_key(request.message, request.language)),
+                        _answer_chat, request.message, request.language, None, schemes, vectors[i]
+                    )
+            return await finish(i, answer)
+        except Exception as e:
+            print(f"Chat batch item {i} error: {e}")
+            return i, ChatResponse(response="Service temporarily unavailable")
+
+    async def run():
+        """Yield (index, ChatResponse) in completion order"""
+        for i, answer in enumerate(answers):
+            if answer is not None:
+                yield await finish(i, answer)
+        if not pending:
+            return
+        try:
+            schemes = await rag_service.retrieve_schemes_batch_async([requests_[i].message for i in pending])
+        except Exception as e:
+            print(f"Chat batch retrieval error: {e}")
+            schemes = [None] * len(pending)
+        for task in asyncio.as_completed([generate(i, s) for i, s in zip(pending, schemes)]):
+            yield await task
+
+    if stream:
+        async def lines():
+            async for i, response in run():
+                yield json.dumps({"index": i, **response.model_dump()}, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    responses = [None] * len(requests_)
+    async for i, response in run():
+        responses[i] = response
+    return ChatBatchResponse(responses=responses, response_time=round(time.perf_counter() - start, 4))
+
+@app.exception_handler(TTSOverloaded)
+async def tts_overloaded_handler(request: Request, exc: TTSOverloaded):
+    """Shed TTS load: clients back off instead of queueing behind a burst"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Text-to-speech is busy, please retry"},
+        headers=exc.headers,
+    )
+
+@app.exception_handler(TTSTextTooLong)
+async def tts_text_too_long_handler(request: Request, exc: TTSTextTooLong):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+# External origin of this API for URLs handed to browsers, e.g. https://api.example.org
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+
+def _check_audio_profile(profile):
+    if profile not in AUDIO_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown audio_profile '{profile}', expected one of: {', '.join(AUDIO_PROFILES)}"
+        )
+    return profile
+
+def _audio_url(http_request: Request, key):
+    """Absolute URL of a cached utterance (None when synthesis failed).
+
+    The frontend plays it from another origin, so the URL must be absolute.
+    PUBLIC_BASE_URL fixes the host when the API sits behind a proxy; otherwise
+    the request's host is used (X-Forwarded-* when uvicorn runs with proxy headers).
+    """
+    if key is None:
+        return None
+    if PUBLIC_BASE_URL:
+        root_path = http_request.scope.get("root_path", "").rstrip("/")
+        return PUBLIC_BASE_URL + root_path + http_request.app.url_path_for("get_audio", key=key)
+    return str(http_request.url_for("get_audio", key=key))
+
 @app.post("/analyze-form")
-async def analyze_form(request: dict):
+async def analyze_form(request: dict, http_request: Request):
     """Analyze uploaded form image"""
+    audio_profile = _check_audio_profile(request.get("audio_profile", "original"))
     try:
         image_data = request.get("image_data")
         language = request.get("language", "English")
@@ -79,46 +423,195 @@ async def analyze_form(request: dict):
         if not image_data:
             raise HTTPException(status_code=400, detail="No image data provided")
 
-        ocr_result = ocr_service.extract_text_from_image(image_data)
-        help_text = rag_service.generate_form_help(ocr_result["fields"], language)
+        # Tesseract + image preprocessing are CPU-bound
+        ocr_result = await run_in_threadpool(ocr_service.extract_text_from_image, image_data)
+        fields_key = json.dumps(ocr_result["fields"], sort_keys=True, ensure_ascii=False)
+        help_text = await llm_flight.do(
+            ("form_help", language, fields_key),
+            rag_service.generate_form_help_async, ocr_result["fields"], language
+        )
 
         if language != "English":
-            help_text = translation_service.translate_text(help_text, language)
+            help_text = await translation_service.translate_text_async(help_text, language)
 
-        audio_url = tts_service.text_to_speech(help_text, language)
+        # OCR and the LLM call are already paid for: when TTS is saturated, return the
+        # help text now and let the client fetch audio later via /generate-audio.
+        # Help text longer than TTS_MAX_CHARS is returned without audio.
+        audio_key, audio_retry_after = None, None
+        try:
+            audio_key = await tts_service.text_to_speech_async(help_text, language, audio_profile)
+        except TTSOverloaded as e:
+            audio_retry_after = e.retry_after
+        except TTSTextTooLong as e:
+            print(f"Form help audio skipped: {e}")
 
         return {
             "text": ocr_result["text"],
             "fields": ocr_result["fields"],
             "help": help_text,
-            "audio_url": audio_url
+            "audio_url": _audio_url(http_request, audio_key),
+            "audio_retry_after": audio_retry_after
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate-audio")
-async def generate_audio(request: dict):
-    """Generate audio for text"""
+async def generate_audio(request: dict, http_request: Request):
+    """Generate audio for text; returns a cacheable URL instead of inline base64.
+
+    `audio_profile` picks the encoding: original (backend output), opus-16k-mono,
+    aac-24k-mono or mulaw-8k.
+    """
+    audio_profile = _check_audio_profile(request.get("audio_profile", "original"))
     try:
         text = request.get("text")
         language = request.get("language", "English")
 
         if not text:
             raise HTTPException(status_code=400, detail="No text provided")
+        tts_service.check_length(text)
 
-        audio_url = tts_service.text_to_speech(text, language)
-        return {"audio_url": audio_url}
+        audio_key = await tts_service.text_to_speech_async(text, language, audio_profile)
+        return {"audio_url": _audio_url(http_request, audio_key)}
+    except (TTSOverloaded, TTSTextTooLong):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-audio/stream")
+async def generate_audio_stream(request: dict):
+    """Stream audio for the full text as sentence chunks finish (chunked transfer, no truncation)"""
+    text = request.get("text")
+    language = request.get("language", "English")
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail="No text provided")
+    tts_service.check_length(text)
+
+    chunks = tts_service.stream_speech(text, language)
+    try:
+        # Fail with a proper status if the first chunk cannot be synthesized
+        _, media_type, first = await chunks.__anext__()
+    except (TTSOverloaded, TTSTextTooLong):
+        raise
+    except Exception as e:
+        await chunks.aclose()
+        raise HTTPException(status_code=500, detail=f"TTS failed: {e}")
+
+    async def body():
+        yield first
+        try:
+            async for _, _, chunk in chunks:
+                yield chunk
+        except Exception as e:
+            print(f"TTS stream error: {e}")
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-store"})
+
+@app.get("/tts/stats")
+async def tts_stats():
+    """TTS executor queue depth, wait/synthesis times, shed requests and backend health"""
+    return {
+        **tts_service.executor.stats(),
+        "cache": tts_service.cache.stats(),
+        "backends": tts_service.stats(),
+        "profiles": tts_service.profiles(),
+    }
+
+@app.get("/audio/{key}", name="get_audio")
+async def get_audio(key: str, http_request: Request):
+    """Stream a synthesized utterance; content-addressed, so it never changes"""
+    cached = tts_service.cache.get(key)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path, media_type = cached
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if_none_match = http_request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or f'"{key}"' in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
 @app.get("/health")
 async def health():
+    backend_search = rag_service.backend_breaker.stats()
+    degraded = backend_search["state"] != "closed"
+    workers = None
+    if translation_pool is not None:
+        pool = translation_pool.stats()
+        workers = {k: pool[k] for k in ("healthy_workers", "queue_depth", "oldest_task_age")}
+        degraded = degraded or pool["healthy_workers"] < translation_pool.num_workers
+    index = None
+    if scheme_index is not None:
+        index = {k: scheme_index.stats()[k] for k in ("ready", "refresh_thread_alive", "last_error")}
+        degraded = degraded or not index["refresh_thread_alive"]
+    tts = tts_service.executor.stats()
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "services": ["document", "ocr", "translation", "tts", "rag"],
+        "llm_provider": rag_service.llm.name,
+        "circuit_breakers": {"backend_search": backend_search},
+        "translation_workers": workers,
+        "scheme_index": index,
+        "tts": {k: tts[k] for k in ("queue_depth", "running", "saturated")},
         "version": "2.0"
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the chat response cache"""
+    return {**chat_cache.stats(), "single_flight": llm_flight.stats(), "tts_audio": tts_service.cache.stats()}
+
+@app.post("/cache/invalidate")
+async def cache_invalidate(user_id: str = Depends(verify_official)):
+    """Drop cached chat responses (call after scheme data changes)"""
+    chat_cache.invalidate()
+    return {"status": "invalidated", "version": chat_cache.version}
+
+@app.get("/sessions/stats")
+async def sessions_stats():
+    """Active sessions and eviction/expiry counters"""
+    return session_store.stats()
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, user_id: str = Depends(get_current_user)):
+    """Forget a conversation; only the user who started it may delete it"""
+    context = await _session_call(session_store.get, session_id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if context.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Session belongs to another user")
+    await _session_call(session_store.delete, session_id)
+    return {"status": "deleted", "session_id": session_id}
+
+@app.get("/intent/stats")
+async def intent_stats():
+    """Share of chat queries answered locally vs escalated to the LLM"""
+    if intent_router is None:
+        return {"enabled": False}
+    return {"enabled": True, **intent_router.stats()}
+
+@app.get("/rag/stats")
+async def rag_stats():
+    """Prompt size statistics against the configured token budget"""
+    return rag_service.prompt_builder.stats()
+
+@app.get("/schemes/index/stats")
+async def scheme_index_stats():
+    """Size, mode and freshness of the local scheme index"""
+    if scheme_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **scheme_index.stats()}
+
+@app.post("/schemes/index/refresh")
+async def scheme_index_refresh(user_id: str = Depends(verify_official)):
+    """Pull scheme changes from the backend now instead of waiting for the next cycle"""
+    if scheme_index is None:
+        raise HTTPException(status_code=404, detail="Scheme index disabled")
+    changed = await run_in_threadpool(scheme_index.refresh)
+    return {"changed": changed, **scheme_index.stats()}
+
 @app.post("/debug/token")
 async def debug_token(request: dict):
     """Debug endpoint to check token format"""
@@ -144,22 +637,104 @@ async def debug_token(request: dict):
         # Translator
 class TranslateIn(BaseModel):
     text: str
-    language: str = "hi"
+    language: str = "auto"  # frontend code (hi, bn, or, kn) or auto-detect
+    profile: Optional[str] = None  # fast | balanced | quality; adaptive when omitted
 
 class TranslateOut(BaseModel):
     translatedText: str
 
+class TranslateBatchIn(BaseModel):
+    texts: List[str]
+    language: str = "auto"  # "auto" detects each text separately
+    profile: Optional[str] = None
+
+class TranslateBatchOut(BaseModel):
+    translatedTexts: List[str]
+    failed: List[int] = []  # indices returned untranslated because their translation failed
+
+# Request languages under which Latin-script text may be romanized Hindi
+ROMANIZED_SOURCE_LANGUAGES = ("auto", "", "hi")
+
+def _is_romanized(text, language):
+    return language in ROMANIZED_SOURCE_LANGUAGES and translation_service.is_romanized(text)
+
+def _check_profile(profile):
+    if profile and profile != "auto" and profile not in DECODING_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile '{profile}', expected one of: auto, {', '.join(DECODING_PROFILES)}"
+        )
+
 @app.post("/translate", response_model=TranslateOut)
-def translate(body: TranslateIn):
+async def translate(body: TranslateIn):
+    if not body.text or not body.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    _check_profile(body.profile)
     try:
-        if not body.text or not body.text.strip():
-            raise HTTPException(status_code=400, detail="Text is required")
-
-        translated = translate_text(body.text, body.language)
-        return {"translatedText": translated}
+        if _is_romanized(body.text, body.language):
+            translated = await translation_service.translate_romanized_async(body.text)
+        else:
+            translated = await translation_batcher.translate(body.text, body.language, body.profile)
     except Exception as e:
-        print(f"Translation endpoint error: {e}")
-        raise HTTPException(status_code=500, detail="Translation failed")
+        # Same degradation as before batching: hand back the source text
+        print(f"Translation error: {e}")
+        translated = body.text
+    return {"translatedText": translated}
+
+@app.post("/translate/batch", response_model=TranslateBatchOut)
+async def translate_batch_endpoint(body: TranslateBatchIn):
+    """Translate many texts in one call; results are in input order.
+
+    Items fail independently: a text whose translation fails comes back
+    unchanged and its index is listed in `failed`.
+    """
+    if not body.texts:
+        raise HTTPException(status_code=400, detail="texts is required")
+    _check_profile(body.profile)
+
+    def translate_one(text):
+        if _is_romanized(text, body.language):
+            return translation_service.translate_romanized_async(text)
+        # Items still share micro-batches with each other and with concurrent requests
+        return translation_batcher.translate(text, body.language, body.profile)
+
+    results = list(body.texts)
+    pending = [i for i, text in enumerate(body.texts) if text and text.strip()]
+    translated = await asyncio.gather(*(translate_one(body.texts[i]) for i in pending), return_exceptions=True)
+    failed = []
+    for i, outcome in zip(pending, translated):
+        if isinstance(outcome, Exception):
+            print(f"Translation batch item {i} error: {outcome}")
+            failed.append(i)
+        else:
+            results[i] = outcome
+    return {"translatedTexts": results, "failed": failed}
+
+class DetectLanguageIn(BaseModel):
+    texts: List[str]
+
+class DetectedLanguage(BaseModel):
+    language: str
+    script: str  # Latin for English and romanized Hindi
+    confidence: float
+
+@app.post("/detect-language", response_model=List[DetectedLanguage])
+async def detect_language(body: DetectLanguageIn):
+    """Local language detection (no model or network call); results are in input order"""
+    return [
+        {"language": language, "script": script, "confidence": confidence}
+        for language, script, confidence in translation_service.detect_languages(body.texts)
+    ]
+
+@app.get("/translate/stats")
+async def translate_stats():
+    """Micro-batching and cache counters for translation"""
+    return {
+        **translation_batcher.stats(),
+        "cache": get_translation_cache().stats(),
+        "models": translation_registry.stats() if translation_pool is None else None,
+        "workers": translation_pool.stats() if translation_pool is not None else None,
+    }
 
 # Add this after your existing imports
 class HateSpeechRequest(BaseModel):
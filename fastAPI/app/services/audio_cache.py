@@ -0,0 +1,148 @@
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+AUDIO_KEY = re.compile(r"^[0-9a-f]{64}$")
+
+# File extension per stored mime type (the extension is how an entry records its type)
+EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/wav": ".wav",
+    "audio/ogg": ".ogg",
+    "audio/aac": ".aac",
+}
+MIME_TYPES = {ext: mime for mime, ext in EXTENSIONS.items()}
+
+
+def audio_key(text, language, voice):
+    """Content address of one utterance: sha256 over (normalized text, language, voice)"""
+    text = " ".join(unicodedata.normalize("NFC", text or "").split())
+    return hashlib.sha256(f"{voice}\x00{language}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def profile_key(key, profile):
+    """Content address of an utterance re-encoded into an output profile"""
+    return hashlib.sha256(f"{key}\x00{profile}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed store of synthesized audio on local disk.
+
+    Each utterance is one immutable file named by its key, with an extension
+    recording its mime type (backends produce different formats), so a key
+    doubles as a strong ETag and can be served with long-lived Cache-Control.
+    An in-memory index (key -> size and extension, in LRU order) is rebuilt
+    from the directory at startup; once the total size passes `max_bytes`
+    the least recently used files are deleted. Workers on one host share the directory: keys
+    another worker wrote are adopted on lookup, and files it evicted are
+    dropped from the index.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.getenv("TTS_CACHE_DIR", "data/tts_cache")
+        if max_bytes is None:
+            max_bytes = float(os.getenv("TTS_CACHE_MAX_MB", 512)) * 1024 * 1024
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._index = OrderedDict()  # key -> (size in bytes, extension)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext not in MIME_TYPES or not AUDIO_KEY.match(key):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, key, stat.st_size, ext))
+        for _, key, size, ext in sorted(entries):
+            self._index[key] = (size, ext)
+            self._bytes += size
+        self._evict()
+
+    def path_for(self, key, ext=".mp3"):
+        return os.path.join(self.directory, f"{key}{ext}")
+
+    def get(self, key):
+        """(path, mime type) of the cached file for `key`, or None"""
+        if not AUDIO_KEY.match(key or ""):
+            return None
+        with self._lock:
+            if key in self._index:
+                size, ext = self._index[key]
+                path = self.path_for(key, ext)
+                if os.path.exists(path):
+                    self._index.move_to_end(key)
+                    self.hits += 1
+                    return path, MIME_TYPES[ext]
+                # Evicted by another worker
+                del self._index[key]
+                self._bytes -= size
+            for ext, mime_type in MIME_TYPES.items():
+                path = self.path_for(key, ext)
+                if os.path.exists(path):
+                    # Written by another worker
+                    self._index[key] = (os.path.getsize(path), ext)
+                    self._bytes += self._index[key][0]
+                    self.hits += 1
+                    return path, mime_type
+            self.misses += 1
+        return None
+
+    def put(self, key, data, mime_type="audio/mpeg"):
+        """Store audio bytes under `key` (atomic rename, so readers never see partial files)"""
+        ext = EXTENSIONS[mime_type]
+        path = self.path_for(key, ext)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0]
+                if previous[1] != ext:
+                    self._remove(key, previous[1])
+            self._index[key] = (len(data), ext)
+            self._bytes += len(data)
+            self._evict()
+        return path
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, (size, ext) = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            self._remove(key, ext)
+
+    def _remove(self, key, ext):
+        try:
+            os.remove(self.path_for(key, ext))
+        except OSError:
+            pass
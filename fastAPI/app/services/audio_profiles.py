@@ -0,0 +1,48 @@
+import os
+import shutil
+import subprocess
+
+# Output encodings for synthesized speech; "original" is whatever the TTS backend produced
+AUDIO_PROFILES = {
+    "original": None,
+    # Mobile web on slow links: Ogg/Opus, wideband speech at 16 kbit/s
+    "opus-16k-mono": {
+        "mime_type": "audio/ogg",
+        "args": ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "16k", "-application", "voip", "-f", "ogg"],
+    },
+    # Browsers without Opus (older Safari): ADTS AAC, 24 kbit/s mono
+    "aac-24k-mono": {
+        "mime_type": "audio/aac",
+        "args": ["-ac", "1", "-ar", "16000", "-c:a", "aac", "-b:a", "24k", "-f", "adts"],
+    },
+    # IVR/telephony: G.711 mu-law, 8 kHz narrowband, in a WAV container
+    "mulaw-8k": {
+        "mime_type": "audio/wav",
+        "args": ["-ac", "1", "-ar", "8000", "-c:a", "pcm_mulaw", "-f", "wav"],
+    },
+}
+
+
+class AudioTranscoder:
+    """Re-encodes audio into an output profile with ffmpeg over pipes (blocking)"""
+
+    def __init__(self, binary=None, timeout=None):
+        self.binary = binary or os.getenv("FFMPEG_BIN") or shutil.which("ffmpeg")
+        self.timeout = float(timeout if timeout is not None else os.getenv("TTS_TRANSCODE_TIMEOUT", 30))
+
+    @property
+    def available(self):
+        return self.binary is not None
+
+    def transcode(self, data, profile):
+        settings = AUDIO_PROFILES[profile]
+        result = subprocess.run(
+            [self.binary, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *settings["args"], "pipe:1"],
+            input=data,
+            capture_output=True,
+            timeout=self.timeout,
+            check=True,
+        )
+        if not result.stdout:
+            raise RuntimeError(f"ffmpeg produced no audio: {result.stderr.decode(errors='replace')[:200]}")
+        return result.stdout
@@ -0,0 +1,105 @@
+import os
+import time
+import threading
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure/latency-rate circuit breaker for an unreliable dependency.
+
+    Closed: calls pass through and outcomes are recorded in a sliding window.
+    When the error rate or slow-call rate over the window crosses its threshold
+    the circuit opens and `allow()` returns False so callers fail fast to their
+    fallback. After `open_seconds` a limited number of half-open probe calls are
+    let through; a successful probe closes the circuit, a failed one reopens it.
+    """
+
+    def __init__(self, name, window_size=None, min_calls=None, failure_rate=None,
+                 slow_call_seconds=None, slow_call_rate=None, open_seconds=None, half_open_calls=None):
+        prefix = f"CB_{name.upper()}_"
+
+        def setting(value, key, default):
+            return value if value is not None else os.getenv(prefix + key, default)
+
+        self.name = name
+        self.window_size = int(setting(window_size, "WINDOW", 20))
+        self.min_calls = int(setting(min_calls, "MIN_CALLS", 5))
+        self.failure_rate = float(setting(failure_rate, "FAILURE_RATE", 0.5))
+        self.slow_call_seconds = float(setting(slow_call_seconds, "SLOW_CALL_SECONDS", 1.5))
+        self.slow_call_rate = float(setting(slow_call_rate, "SLOW_CALL_RATE", 0.5))
+        self.open_seconds = float(setting(open_seconds, "OPEN_SECONDS", 30))
+        self.half_open_calls = int(setting(half_open_calls, "HALF_OPEN_CALLS", 1))
+
+        self.state = CLOSED
+        self._window = deque(maxlen=self.window_size)  # (succeeded, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self):
+        """Whether a call may go to the dependency right now"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, succeeded, duration):
+        """Record the outcome and latency of a call that `allow()` let through"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self.state == OPEN:
+                # A call let through before the circuit opened; it must not restart the open window
+                return
+            if self.state == HALF_OPEN:
+                if succeeded and not slow:
+                    self.state = CLOSED
+                    self._window.clear()
+                else:
+                    self._open()
+                return
+
+            self._window.append((succeeded, slow))
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in self._window if not ok)
+            slow_calls = sum(1 for _, is_slow in self._window if is_slow)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._window.clear()
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._window)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "failure_rate": round(sum(1 for ok, _ in self._window if not ok) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for _, slow in self._window if slow) / calls, 3) if calls else 0.0,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "retry_in": round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+                if self.state == OPEN else 0.0,
+            }
@@ -0,0 +1,301 @@
+import os
+import pickle
+import threading
+
+from app.chat_models import ChatType
+from app.services.response_cache import normalize_query
+
+# Seed utterances for the local intent classifier (English, Hindi, romanized Hindi)
+SEED_UTTERANCES = {
+    ChatType.SCHEME_SEARCH: [
+        "what is pm kisan",
+        "tell me about ayushman bharat",
+        "details of pm awas yojana",
+        "what are the benefits of mudra yojana",
+        "which schemes are there for farmers",
+        "schemes for women entrepreneurs",
+        "information about mgnrega",
+        "what does jan dhan yojana give",
+        "pm kisan ke bare me batao",
+        "ayushman card kya hai",
+        "पीएम किसान योजना क्या है",
+        "आयुष्मान भारत के लाभ",
+    ],
+    ChatType.ELIGIBILITY_CHECK: [
+        "am i eligible for pm kisan",
+        "who is eligible for ayushman bharat",
+        "eligibility criteria for mudra loan",
+        "can i apply for pm awas yojana if i have a house",
+        "what is the age limit for atal pension yojana",
+        "is a student eligible for this scholarship",
+        "who can get widow pension",
+        "kya main pm kisan ke liye eligible hoon",
+        "patrata kya hai",
+        "पीएम किसान के लिए पात्रता",
+        "कौन आवेदन कर सकता है",
+    ],
+    ChatType.APPLICATION_HELP: [
+        "how to apply for pm kisan",
+        "how do i apply for ayushman card",
+        "application process for mudra loan",
+        "where can i apply for pm awas yojana",
+        "what documents are required for pm kisan",
+        "steps to register for e shram card",
+        "documents needed for scholarship application",
+        "apply kaise kare",
+        "kaun se documents chahiye",
+        "आवेदन कैसे करें",
+        "कौन से दस्तावेज चाहिए",
+    ],
+    ChatType.STATUS_INQUIRY: [
+        "what is the status of my application",
+        "check my application status",
+        "when will i get my pm kisan installment",
+        "my application is pending",
+        "track my application",
+        "has my application been approved",
+        "why was my application rejected",
+        "mera application status kya hai",
+        "paisa kab aayega",
+        "मेरे आवेदन की स्थिति",
+        "किस्त कब आएगी",
+    ],
+    ChatType.FORM_ASSISTANCE: [
+        "help me fill this form",
+        "what should i write in the address field",
+        "how to fill the application form",
+        "which name should i write in the form",
+        "form bharne me madad karo",
+        "फॉर्म भरने में मदद",
+    ],
+    ChatType.GENERAL_QUERY: [
+        "i lost my job and my father is sick what can i do",
+        "compare government support for small shops in bengal and odisha",
+        "explain how direct benefit transfer works and why my bank shows a different amount",
+        "my landlord is asking me to leave what are my rights",
+        "i am a single mother with two kids and no income suggest something",
+        "write a letter to the collector about a broken road",
+        "hello",
+        "thank you",
+        "what can you do",
+        "मेरी समस्या का समाधान बताइए",
+    ],
+}
+
+STATUS_TEMPLATE = (
+    "To check your application status:\n"
+    "1. Open the Applications page in JanSethu and select your application.\n"
+    "2. For central schemes you can also check the official portal of the scheme "
+    "using your application or Aadhaar-linked mobile number.\n"
+    "3. If it has been pending for more than 30 days, contact your nearest "
+    "Common Service Centre (CSC) or the scheme helpline with your application ID."
+)
+
+
+class IntentRouter:
+    """Local TF-IDF intent classifier that answers simple queries from templates.
+
+    Scheme lookups, eligibility and how-to-apply questions that name a known
+    scheme, and status questions, are answered from precomputed templates built
+    from scheme data. Everything else (or anything below the confidence
+    threshold) is escalated to the LLM by returning None.
+    """
+
+    ROUTABLE = {
+        ChatType.SCHEME_SEARCH,
+        ChatType.ELIGIBILITY_CHECK,
+        ChatType.APPLICATION_HELP,
+        ChatType.STATUS_INQUIRY,
+    }
+
+    def __init__(self, scheme_index=None, threshold=None, model_dir=None):
+        self.threshold = float(threshold if threshold is not None else os.getenv("INTENT_ROUTER_THRESHOLD", 0.6))
+        self.languages = {
+            l.strip().casefold() for l in os.getenv("INTENT_ROUTER_LANGUAGES", "English").split(",") if l.strip()
+        }
+        self.scheme_index = scheme_index
+        self.vectorizer, self.model = self._load_or_train(
+            model_dir or os.getenv("INTENT_MODEL_DIR", "Intent")
+        )
+
+        # normalized scheme name/acronym -> scheme, and (scheme id, intent) -> answer
+        self._names = {}
+        self._answers = {}
+        self._lock = threading.Lock()
+
+        self.routed = 0
+        self.escalated = 0
+
+        if scheme_index is not None:
+            scheme_index.on_change(self.rebuild)
+        self.rebuild()
+
+    # ---------------- Classification ----------------
+    def _load_or_train(self, model_dir):
+        """Load pickled vectorizer/model (same layout as Hate-Speech/), else train on the seed set"""
+        vectorizer_path = os.path.join(model_dir, "vectorizer.pkl")
+        model_path = os.path.join(model_dir, "model.pkl")
+        if os.path.exists(vectorizer_path) and os.path.exists(model_path):
+            try:
+                with open(vectorizer_path, "rb") as f:
+                    vectorizer = pickle.load(f)
+                with open(model_path, "rb") as f:
+                    model = pickle.load(f)
+                print(f"✅ Loaded intent model from: {model_dir}")
+                return vectorizer, model
+            except Exception as e:
+                print(f"❌ Error loading intent model, retraining: {e}")
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        texts, labels = [], []
+        for intent, utterances in SEED_UTTERANCES.items():
+            for utterance in utterances:
+                texts.append(normalize_query(utterance))
+                labels.append(intent.value)
+
+        # Character n-grams cope with romanized Hindi spelling variants and Indic scripts
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True)
+        model = LogisticRegression(max_iter=1000, C=10)
+        model.fit(vectorizer.fit_transform(texts), labels)
+        return vectorizer, model
+
+    def classify(self, text):
+        """Return (ChatType, probability)"""
+        probabilities = self.model.predict_proba(self.vectorizer.transform([normalize_query(text)]))[0]
+        best = int(probabilities.argmax())
+        return ChatType(self.model.classes_[best]), float(probabilities[best])
+
+    # ---------------- Templates ----------------
+    def rebuild(self):
+        """Recompute the scheme name lookup and templated answers from the index"""
+        names, answers = {}, {}
+        schemes = []
+        if self.scheme_index is not None:
+            schemes = self.scheme_index.all_schemes()
+
+        for scheme in schemes:
+            scheme_id = scheme.get("_id")
+            for label in (scheme.get("name"), scheme.get("acronym")):
+                key = normalize_query(label or "")
+                if len(key) >= 3:
+                    names[key] = scheme
+            answers[(scheme_id, ChatType.SCHEME_SEARCH)] = self._scheme_answer(scheme)
+            answers[(scheme_id, ChatType.ELIGIBILITY_CHECK)] = self._eligibility_answer(scheme)
+            answers[(scheme_id, ChatType.APPLICATION_HELP)] = self._application_answer(scheme)
+
+        with self._lock:
+            self._names, self._answers = names, answers
+
+    def find_scheme(self, text):
+        """Longest known scheme name/acronym contained in the text"""
+        query = f" {normalize_query(text)} "
+        best = None
+        with self._lock:
+            names = self._names
+        for key, scheme in names.items():
+            if f" {key} " in query and (best is None or len(key) > len(best[0])):
+                best = (key, scheme)
+        return best[1] if best else None
+
+    def route(self, message, language="English"):
+        """Templated answer dict for simple queries, or None to escalate to the LLM"""
+        if (language or "English").casefold() not in self.languages:
+            return None
+
+        intent, confidence = self.classify(message)
+        answer = None
+        scheme = None
+        if confidence >= self.threshold and intent in self.ROUTABLE:
+            if intent == ChatType.STATUS_INQUIRY:
+                answer = STATUS_TEMPLATE
+            else:
+                scheme = self.find_scheme(message)
+                if scheme is not None:
+                    with self._lock:
+                        answer = self._answers.get((scheme.get("_id"), intent))
+
+        with self._lock:
+            if answer is None:
+                self.escalated += 1
+                return None
+            self.routed += 1
+
+        related = []
+        if scheme is not None:
+            related.append({k: v for k, v in {
+                "id": scheme.get("_id"),
+                "name": scheme.get("name"),
+                "source_url": scheme.get("source_url"),
+            }.items() if v})
+        return {
+            "response": answer,
+            "intent": intent.value,
+            "confidence": round(confidence, 4),
+            "related_schemes": related,
+            "suggested_actions": self._suggested_actions(intent),
+        }
+
+    def stats(self):
+        with self._lock:
+            total = self.routed + self.escalated
+            return {
+                "routed": self.routed,
+                "escalated": self.escalated,
+                "routed_share": round(self.routed / total, 4) if total else 0.0,
+                "threshold": self.threshold,
+                "known_schemes": len(self._names),
+            }
+
+    # ---------------- Helpers ----------------
+    @staticmethod
+    def _field(scheme, name, limit=400):
+        value = scheme.get(name)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        value = " ".join(value.split())
+        return value if len(value) <= limit else value[:limit].rsplit(" ", 1)[0] + "..."
+
+    def _scheme_answer(self, scheme):
+        lines = [f"**{scheme.get('name', 'Scheme')}**"]
+        for label, field in (("Overview", "overview"), ("Benefits", "benefits"), ("Eligibility", "eligibility")):
+            value = self._field(scheme, field)
+            if value:
+                lines.append(f"{label}: {value}")
+        if scheme.get("source_url"):
+            lines.append(f"More details: {scheme['source_url']}")
+        return "\n".join(lines)
+
+    def _eligibility_answer(self, scheme):
+        eligibility = self._field(scheme, "eligibility", 600)
+        if not eligibility:
+            return None
+        lines = [f"**Eligibility for {scheme.get('name', 'this scheme')}**", eligibility]
+        documents = self._field(scheme, "documents", 300)
+        if documents:
+            lines.append(f"Documents usually required: {documents}")
+        return "\n".join(lines)
+
+    def _application_answer(self, scheme):
+        apply = self._field(scheme, "apply", 600)
+        documents = self._field(scheme, "documents", 400)
+        if not apply and not documents:
+            return None
+        lines = [f"**How to apply for {scheme.get('name', 'this scheme')}**"]
+        if apply:
+            lines.append(apply)
+        if documents:
+            lines.append(f"Required documents: {documents}")
+        if scheme.get("source_url"):
+            lines.append(f"Official page: {scheme['source_url']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _suggested_actions(intent):
+        return {
+            ChatType.SCHEME_SEARCH: ["Check eligibility", "How to apply"],
+            ChatType.ELIGIBILITY_CHECK: ["How to apply", "Required documents"],
+            ChatType.APPLICATION_HELP: ["Check application status"],
+            ChatType.STATUS_INQUIRY: ["Contact nearest CSC"],
+        }.get(intent, [])
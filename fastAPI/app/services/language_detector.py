@@ -0,0 +1,187 @@
+import math
+import unicodedata
+from collections import Counter
+
+# (script, language, first code point, last code point) of each Indic script block
+SCRIPT_RANGES = [
+    ("Devanagari", "Hindi", 0x0900, 0x097F),
+    ("Bengali", "Bengali", 0x0980, 0x09FF),  # Bengali-Assamese
+    ("Odia", "Odia", 0x0B00, 0x0B7F),
+    ("Kannada", "Kannada", 0x0C80, 0x0CFF),
+]
+SCRIPT_LANGUAGES = {script: language for script, language, _, _ in SCRIPT_RANGES}
+
+# IndicTrans codes by (language, script). Romanized Hindi has none: IndicTrans
+# expects Devanagari, so Latin-script Hindi must not be tagged hin_Deva.
+LANGUAGE_CODES = {
+    ("English", "Latin"): "eng_Latn",
+    ("Hindi", "Devanagari"): "hin_Deva",
+    ("Bengali", "Bengali"): "ben_Beng",
+    ("Odia", "Odia"): "ory_Orya",
+    ("Kannada", "Kannada"): "kan_Knda",
+}
+
+# Scheme names and other Hindi-origin words that English queries use as-is.
+# They say nothing about the sentence's language, so the Latin model ignores them.
+SCHEME_TERMS = frozenset("""
+    pm pradhan mantri yojana kisan samman nidhi ayushman bharat awas jan dhan
+    ujjwala sukanya samriddhi mudra atal pension aadhaar aadhar card ration
+    mgnrega nrega swachh jeevan jyoti bima suraksha garib kalyan anna shram
+    e-shram ujala kaushal vikas mission gramin
+""".split())
+
+# Seed text for the Latin-script model: English vs romanized Hindi
+LATIN_SEED = {
+    "English": [
+        "what is the status of my application",
+        "how do i apply for this scheme",
+        "which documents are required",
+        "i want to know about the benefits",
+        "who is eligible for the pension",
+        "please help me fill this form",
+        "when will i get the money in my bank account",
+        "tell me about schemes for farmers and students",
+        "thank you very much for the information",
+        "my name is not correct in the certificate",
+        "where is the nearest office",
+        "can you explain the process step by step",
+        "what is this scheme and what does it give",
+        "is there any scholarship for girls",
+        "how much money will i receive",
+        "hello good morning",
+        "pm kisan status check",
+        "ayushman card download",
+        "apply for pm awas yojana online",
+        "ujjwala gas connection eligibility",
+        "sukanya samriddhi account interest rate",
+        "jan dhan account balance",
+        "how to link aadhaar with my bank account",
+        "mudra loan documents list",
+    ],
+    "Hindi": [
+        "mera application status kya hai",
+        "is yojana ke liye apply kaise kare",
+        "kaun se documents chahiye",
+        "mujhe iske fayde ke bare me batao",
+        "pension ke liye kaun patra hai",
+        "yeh form bharne me meri madad karo",
+        "paisa mere bank khate me kab aayega",
+        "kisano aur chhatron ke liye yojana batao",
+        "jankari ke liye bahut dhanyavad",
+        "praman patra me mera naam galat hai",
+        "sabse nazdeek daftar kahan hai",
+        "kya aap mujhe samjha sakte ho ki kya karna hai",
+        "mujhe nahi pata ki main eligible hoon ya nahi",
+        "aadhar card ki zarurat hai kya",
+    ],
+}
+
+
+class LanguageDetector:
+    """Local language identification for the languages the app serves.
+
+    Indic scripts map one-to-one to a language, so a Unicode-script histogram
+    decides them; confidence is the dominant script's share of letters.
+    Latin-script text goes to a small character-trigram naive Bayes model that
+    separates English from romanized Hindi. Scheme names are not evidence
+    either way, and romanized Hindi is only reported with at least
+    `min_romanized_words` other words and a clear margin; anything less is
+    treated as English. Results carry the script as well
+    as the language, since romanized Hindi needs different handling from
+    Devanagari. No model files or network calls.
+    """
+
+    def __init__(self, seed=None, ngram=3, min_romanized_probability=0.9, min_romanized_words=3):
+        self.ngram = ngram
+        self.min_romanized_probability = min_romanized_probability
+        self.min_romanized_words = min_romanized_words
+        self._counts = {}
+        self._totals = {}
+        vocabulary = set()
+        for language, sentences in (seed or LATIN_SEED).items():
+            counts = Counter()
+            for sentence in sentences:
+                counts.update(self._ngrams(sentence))
+            self._counts[language] = counts
+            self._totals[language] = sum(counts.values())
+            vocabulary.update(counts)
+        self._vocabulary_size = len(vocabulary) + 1
+
+    def detect(self, text):
+        """Return (language, script, confidence) for one text"""
+        scripts = Counter()
+        for ch in text or "":
+            if not ch.isalpha():
+                continue
+            scripts[self._script(ord(ch))] += 1
+        letters = sum(scripts.values())
+        if not letters:
+            return "English", "Latin", 0.0
+
+        script, count = scripts.most_common(1)[0]
+        share = count / letters
+        if script != "Latin":
+            return SCRIPT_LANGUAGES[script], script, round(share, 4)
+
+        language, probability = self._classify_latin(text)
+        return language, script, round(share * probability, 4)
+
+    def detect_batch(self, texts):
+        return [self.detect(text) for text in texts]
+
+    def detect_code(self, text):
+        """IndicTrans code of the detected language, or None for romanized Hindi"""
+        language, script, _ = self.detect(text)
+        return LANGUAGE_CODES.get((language, script))
+
+    # ---------------- Helpers ----------------
+    @staticmethod
+    def _script(code_point):
+        for script, _, start, end in SCRIPT_RANGES:
+            if start <= code_point <= end:
+                return script
+        return "Latin"
+
+    @staticmethod
+    def _words(text):
+        text = unicodedata.normalize("NFC", text).casefold()
+        return "".join(ch if ch.isalpha() else " " for ch in text).split()
+
+    def _ngrams(self, text, words=None):
+        grams = []
+        for word in words if words is not None else self._words(text):
+            padded = f" {word} "
+            grams.extend(padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1)))
+        return grams
+
+    def _classify_latin(self, text):
+        words = [word for word in self._words(text) if word not in SCHEME_TERMS]
+        grams = self._ngrams(text, words)
+        if not grams:
+            return "English", 0.5
+        scores = {}
+        for language, counts in self._counts.items():
+            total = self._totals[language] + self._vocabulary_size
+            scores[language] = sum(math.log((counts.get(g, 0) + 1) / total) for g in grams)
+        best = max(scores, key=scores.get)
+        # Posterior over the candidate languages from the log-likelihoods
+        top = scores[best]
+        probability = 1.0 / sum(math.exp(score - top) for score in scores.values())
+        # Short English questions share many trigrams with romanized Hindi; require
+        # enough words and a clear margin
+        if best != "English" and (
+            len(words) < self.min_romanized_words or probability < self.min_romanized_probability
+        ):
+            return "English", 1.0 - probability
+        return best, probability
+
+
+_detector = None
+
+
+def get_language_detector():
+    """Shared LanguageDetector (built once per process)"""
+    global _detector
+    if _detector is None:
+        _detector = LanguageDetector()
+    return _detector
@@ -0,0 +1,122 @@
+import os
+import time
+import asyncio
+import hashlib
+from fastapi.concurrency import run_in_threadpool
+
+
+class LLMProvider:
+    """Text-in/text-out LLM backend used by RAGService and TranslationService"""
+
+    name = "base"
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    async def generate_async(self, prompt):
+        return await run_in_threadpool(self.generate, prompt)
+
+    def generate_stream(self, prompt):
+        """Yield text chunks; providers without streaming yield one chunk"""
+        yield self.generate(prompt)
+
+    async def generate_stream_async(self, prompt):
+        yield await self.generate_async(prompt)
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through google.generativeai"""
+
+    name = "gemini"
+
+    def __init__(self, model_name, api_key=None):
+        import google.generativeai as genai
+
+        api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt).text
+
+    async def generate_async(self, prompt):
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    def generate_stream(self, prompt):
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+    async def generate_stream_async(self, prompt):
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class LocalLLMProvider(LLMProvider):
+    """Offline stand-in for load tests and benchmarks.
+
+    Returns a deterministic response derived from the prompt hash after a
+    configurable first-token latency, then (when streaming) one word per
+    token delay. No network access or API key needed.
+    """
+
+    name = "local"
+
+    def __init__(self, latency_ms=None, token_delay_ms=None, response_words=None):
+        self.latency = float(latency_ms if latency_ms is not None else os.getenv("LOCAL_LLM_LATENCY_MS", 200)) / 1000
+        self.token_delay = float(
+            token_delay_ms if token_delay_ms is not None else os.getenv("LOCAL_LLM_TOKEN_DELAY_MS", 10)
+        ) / 1000
+        self.response_words = int(
+            response_words if response_words is not None else os.getenv("LOCAL_LLM_RESPONSE_WORDS", 60)
+        )
+        self.model_name = "local-standin"
+
+    def _words(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        words = [f"[local:{digest[:8]}]"]
+        for i in range(self.response_words - 1):
+            words.append(f"w{digest[i % len(digest)]}{i}")
+        return words
+
+    def generate(self, prompt):
+        words = self._words(prompt)
+        time.sleep(self.latency + self.token_delay * (len(words) - 1))
+        return " ".join(words)
+
+    async def generate_async(self, prompt):
+        words = self._words(prompt)
+        await asyncio.sleep(self.latency + self.token_delay * (len(words) - 1))
+        return " ".join(words)
+
+    def generate_stream(self, prompt):
+        time.sleep(self.latency)
+        for i, word in enumerate(self._words(prompt)):
+            if i:
+                time.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+    async def generate_stream_async(self, prompt):
+        await asyncio.sleep(self.latency)
+        for i, word in enumerate(self._words(prompt)):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+def get_llm_provider(model_name):
+    """Provider selected by LLM_PROVIDER ("gemini" by default, or "local")"""
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    if provider == "local":
+        return LocalLLMProvider()
+    if provider == "gemini":
+        return GeminiProvider(model_name)
+    raise ValueError(f"Unknown LLM_PROVIDER: {provider}")
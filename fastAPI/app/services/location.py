@@ -1,12 +1,12 @@
-import requests
 from typing import Optional, Dict, Any
+from app.utils.http_client import get_http_client
 
 class LocationService:
     @staticmethod
     async def get_location_from_ip(ip_address: str) -> Optional[Dict[str, Any]]:
         """Get location data from IP address using ipapi.co"""
         try:
-            response = requests.get(f"http://ipapi.co/{ip_address}/json/", timeout=5)
+            response = await get_http_client().get(f"http://ipapi.co/{ip_address}/json/", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return {
@@ -34,7 +34,7 @@ class LocationService:
             }
             headers = {"User-Agent": "HackodishaApp/1.0"}
             
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            response = await get_http_client().get(url, params=params, headers=headers, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 address = data.get("address", {})
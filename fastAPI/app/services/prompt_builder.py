@@ -0,0 +1,277 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# Static knowledge base, split so only the sections relevant to a query are sent.
+# Each entry: (keywords that select the section, section text)
+SERVICE_CONTEXT_SECTIONS = {
+    "INSURANCE SERVICES": (
+        ["insurance", "bima", "life", "accident", "crop", "ayushman", "cover", "बीमा", "বিমা"],
+        """- Pradhan Mantri Jeevan Jyoti Bima Yojana (Life Insurance - ₹2 lakh)
+- Pradhan Mantri Suraksha Bima Yojana (Accident Insurance - ₹2 lakh)
+- Pradhan Mantri Fasal Bima Yojana (Crop Insurance)
+- Ayushman Bharat (Health Insurance - ₹5 lakh)""",
+    ),
+    "HEALTHCARE SERVICES": (
+        ["health", "hospital", "medical", "medicine", "doctor", "aiims", "phc", "aushadhi", "treatment", "स्वास्थ्य", "अस्पताल", "স্বাস্থ্য"],
+        """- AIIMS hospitals and government medical colleges
+- Primary Health Centers (PHCs) and Community Health Centers
+- Jan Aushadhi stores for affordable medicines
+- National Health Mission programs""",
+    ),
+    "EDUCATION & SCHOLARSHIPS": (
+        ["scholarship", "student", "education", "school", "college", "study", "yasasvi", "matric", "छात्रवृत्ति", "शिक्षा", "বৃত্তি"],
+        """- National Scholarship Portal (scholarships.gov.in)
+- PM YASASVI Scheme for OBC/EBC/DNT students
+- Post Matric Scholarship for SC/ST/OBC
+- Merit-cum-Means Scholarship""",
+    ),
+    "EMPLOYMENT & SKILLS": (
+        ["job", "employment", "work", "mgnrega", "nrega", "skill", "training", "startup", "rozgar", "unemployed", "रोजगार", "नौकरी", "কাজ"],
+        """- MGNREGA (100 days guaranteed employment)
+- Pradhan Mantri Kaushal Vikas Yojana (Skill Development)
+- Startup India and Stand Up India
+- Rozgar Mela (Government job fairs)""",
+    ),
+    "DIGITAL SERVICES": (
+        ["aadhaar", "aadhar", "pan", "passport", "licence", "license", "driving", "vehicle", "certificate", "caste", "domicile", "income certificate", "आधार", "प्रमाण पत्र", "আধার"],
+        """- Aadhaar services and updates
+- PAN card application and services
+- Passport services (passportindia.gov.in)
+- Driving license and vehicle registration
+- Income/caste/domicile certificates""",
+    ),
+    "FINANCIAL SERVICES": (
+        ["bank", "account", "loan", "mudra", "credit", "kisan", "farmer", "dbt", "jan dhan", "business", "ऋण", "लोन", "किसान", "ঋণ", "কৃষক"],
+        """- Jan Dhan Yojana (Bank accounts)
+- PM Mudra Yojana (Business loans)
+- Kisan Credit Card
+- Direct Benefit Transfer (DBT)""",
+    ),
+    "SOCIAL WELFARE": (
+        ["ration", "pds", "pension", "widow", "disability", "disabled", "senior", "old age", "elderly", "welfare", "राशन", "पेंशन", "ভাতা"],
+        """- Public Distribution System (PDS/Ration)
+- Widow pension schemes
+- Disability pension and certificates
+- Senior citizen benefits""",
+    ),
+}
+
+# (field, max chars) in the order they are worth including
+SNIPPET_FIELDS = [
+    ("overview", 200),
+    ("eligibility", 150),
+    ("benefits", 150),
+    ("documents", 100),
+]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+ASCII_CHARS_PER_TOKEN = 4
+INDIC_CHARS_PER_TOKEN = 2
+
+# Share of the budget the user's query may take on its own
+MAX_QUERY_BUDGET_SHARE = 0.25
+
+
+def estimate_tokens(text):
+    """Cheap token estimate: ~4 chars/token for ASCII, ~2 for Indic scripts.
+
+    Close enough to Gemini's tokenizer to enforce a budget without a network call.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // ASCII_CHARS_PER_TOKEN + non_ascii // INDIC_CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    budget: int
+    sections: List[str] = field(default_factory=list)
+    schemes: List[Dict] = field(default_factory=list)
+
+
+class PromptBuilder:
+    """Builds the scheme-search prompt within a token budget.
+
+    Only service-context sections whose keywords match the query are included,
+    schemes are ranked by retrieval score plus query-term overlap, and each scheme
+    is rendered at the richest detail level that still fits the budget.
+    """
+
+    def __init__(self, token_budget=None):
+        self.token_budget = int(token_budget if token_budget is not None else os.getenv("RAG_PROMPT_TOKEN_BUDGET", 1200))
+        if self.token_budget <= 0:
+            raise ValueError(f"RAG prompt token budget must be positive, got {self.token_budget}")
+
+        # Per-scheme snippets at each detail level, computed once per scheme version
+        self._snippets = {}
+        self._lock = threading.Lock()
+
+        self.prompts_built = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+
+    def build(self, query, language, schemes=None, fallback_schemes_text=None, history_text=None):
+        # Keep a pathological query from blowing the budget on its own
+        max_query_tokens = max(1, int(self.token_budget * MAX_QUERY_BUDGET_SHARE))
+        query_tokens = estimate_tokens(query)
+        if query_tokens > max_query_tokens:
+            # The query's own chars/token ratio, so Devanagari is cut as fairly as ASCII
+            query = query[:int(len(query) * max_query_tokens / query_tokens)]
+
+        header = (
+            "You are an Indian Government Services Assistant. "
+            "Answer directly without preambles or disclaimers.\n\n"
+            f"User Query: {query}\nLanguage: {language}\n"
+        )
+        instructions = (
+            "\nInstructions:\n"
+            "- Answer the query directly\n"
+            "- List relevant schemes with eligibility and benefits\n"
+            "- Include required documents and application process\n"
+            "- No introductory text or disclaimers\n"
+            "- Be concise and helpful\n"
+            f"- Respond in {language}\n"
+        )
+        remaining = self.token_budget - estimate_tokens(header) - estimate_tokens(instructions)
+        parts = [header]
+
+        # Conversation history may use at most a third of the budget; oldest lines go first
+        if history_text:
+            lines = history_text.splitlines()
+            while lines and estimate_tokens("\n".join(lines)) > remaining // 3:
+                lines.pop(0)
+            if lines:
+                block = "\nConversation So Far:\n" + "\n".join(lines) + "\n"
+                parts.append(block)
+                remaining -= estimate_tokens(block)
+
+        # Schemes first: they are the grounding the answer depends on most
+        included_schemes = []
+        if schemes is None:
+            block = f"\nRelevant Schemes Found:\n{(fallback_schemes_text or '').strip()}\n"
+            parts.append(block)
+            remaining -= estimate_tokens(block)
+        else:
+            scheme_lines = []
+            used = estimate_tokens("\nRelevant Schemes Found:\n")
+            for scheme in self.rank_schemes(query, schemes):
+                for snippet in self._scheme_snippets(scheme):
+                    cost = estimate_tokens(snippet)
+                    if used + cost <= remaining:
+                        scheme_lines.append(snippet)
+                        included_schemes.append(scheme)
+                        used += cost
+                        break
+            if not scheme_lines:
+                scheme_lines.append("No specific schemes found for this query.")
+            block = "\nRelevant Schemes Found:\n" + "\n".join(scheme_lines) + "\n"
+            parts.append(block)
+            remaining -= estimate_tokens(block)
+
+        # Service context: only sections the query is about, best match first
+        sections = []
+        section_parts = []
+        remaining -= estimate_tokens("\nGovernment Services Context:\n")
+        for title in self.relevant_sections(query):
+            text = f"{title}:\n{SERVICE_CONTEXT_SECTIONS[title][1]}\n"
+            cost = estimate_tokens(text)
+            if cost > remaining:
+                continue
+            section_parts.append(text)
+            sections.append(title)
+            remaining -= cost
+        if section_parts:
+            parts.append("\nGovernment Services Context:\n" + "".join(section_parts))
+
+        parts.append(instructions)
+        text = "".join(parts)
+        tokens = estimate_tokens(text)
+
+        with self._lock:
+            self.prompts_built += 1
+            self.total_tokens += tokens
+            self.max_tokens = max(self.max_tokens, tokens)
+
+        return BuiltPrompt(
+            text=text,
+            tokens=tokens,
+            budget=self.token_budget,
+            sections=sections,
+            schemes=included_schemes,
+        )
+
+    def relevant_sections(self, query):
+        """Titles of sections whose keywords occur in the query, most matches first"""
+        query_lower = (query or "").casefold()
+        words = set(_WORD_RE.findall(query_lower))
+        scored = []
+        for position, (title, (keywords, _)) in enumerate(SERVICE_CONTEXT_SECTIONS.items()):
+            # Single ASCII keywords must match whole words ("pan" should not match "company")
+            matches = sum(
+                1 for k in keywords
+                if (k in words if k.isascii() and " " not in k else k in query_lower)
+            )
+            if matches:
+                scored.append((-matches, position, title))
+        scored.sort()
+        return [title for _, _, title in scored]
+
+    def rank_schemes(self, query, schemes):
+        """Order schemes by retrieval score plus overlap with query terms"""
+        terms = {w for w in _WORD_RE.findall((query or "").casefold()) if len(w) > 2}
+        ranked = []
+        for position, scheme in enumerate(schemes):
+            score = scheme.get("score")
+            base = float(score) if isinstance(score, (int, float)) else 1.0 / (position + 1)
+            name = f"{scheme.get('name', '')} {scheme.get('acronym', '')}".casefold()
+            overlap = sum(1 for t in terms if t in name)
+            ranked.append((base + 0.1 * overlap, -position, scheme))
+        ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [scheme for _, _, scheme in ranked]
+
+    def _scheme_snippets(self, scheme):
+        """Snippets from most to least detailed (full, compact, name only)"""
+        key = (scheme.get("_id") or scheme.get("name"), scheme.get("updatedAt"))
+        with self._lock:
+            cached = self._snippets.get(key)
+        if cached is not None:
+            return cached
+
+        name = scheme.get("name") or "N/A"
+        lines = [f"Scheme: {name}"]
+        for field_name, limit in SNIPPET_FIELDS:
+            value = scheme.get(field_name)
+            if isinstance(value, str) and value.strip():
+                value = " ".join(value.split())
+                if len(value) > limit:
+                    value = value[:limit].rsplit(" ", 1)[0] + "..."
+                lines.append(f"{field_name.capitalize()}: {value}")
+
+        snippets = [
+            "\n".join(lines) + "\n",
+            "\n".join(lines[:1] + [l for l in lines[1:] if l.startswith(("Eligibility", "Benefits"))]) + "\n",
+            f"Scheme: {name}\n",
+        ]
+        with self._lock:
+            if len(self._snippets) > 5000:
+                self._snippets.clear()
+            self._snippets[key] = snippets
+        return snippets
+
+    def stats(self):
+        with self._lock:
+            return {
+                "token_budget": self.token_budget,
+                "prompts_built": self.prompts_built,
+                "avg_tokens": round(self.total_tokens / self.prompts_built, 1) if self.prompts_built else 0,
+                "max_tokens": self.max_tokens,
+                "cached_snippets": len(self._snippets),
+            }
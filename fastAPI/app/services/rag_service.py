@@ -1,61 +1,115 @@
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
+import time
+import asyncio
+import threading
 import requests
 import json
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from app.utils.http_client import get_http_client
+from app.services.llm_provider import get_llm_provider
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.response_cache import normalize_query
+from app.services.prompt_builder import PromptBuilder, SERVICE_CONTEXT_SECTIONS
+
+
+def _search_results(body):
+    """Scheme list from a /schemes/search response body.
+
+    The backend answers {"results": [...]}; a failed vector search comes back
+    as HTTP 200 with {"results": {"error": ...}}, which is raised here so it
+    counts as a failure.
+    """
+    results = body.get("results") if isinstance(body, dict) else None
+    if not isinstance(results, list):
+        error = results.get("error") if isinstance(results, dict) else None
+        raise ValueError(f"Backend scheme search failed: {error or 'unexpected response'}")
+    return results
+
 
 class RAGService:
-    def __init__(self):
+    def __init__(self, scheme_index=None):
         load_dotenv()
 
-        # ---- Gemini Setup ----
-        gemini_key = os.getenv("GOOGLE_API_KEY")
-        if not gemini_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        genai.configure(api_key=gemini_key)
-        self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+        # ---- LLM Setup (Gemini, or the local stand-in with LLM_PROVIDER=local) ----
+        self.llm = get_llm_provider(os.getenv("RAG_MODEL", "gemini-1.5-flash"))
         
         # Backend URL for scheme search
         self.backend_url = os.getenv("BACKEND_URL", "http://localhost:5000")
 
+        # Backend search is latency-bounded and guarded by a circuit breaker
+        self.backend_timeout = float(os.getenv("BACKEND_SEARCH_TIMEOUT", 3))
+        self.backend_breaker = CircuitBreaker("backend_search")
+        self.last_good_size = int(os.getenv("BACKEND_LAST_GOOD_SIZE", 1000))
+        self._last_good = OrderedDict()
+        self._last_good_lock = threading.Lock()
+
+        # Optional in-process index (app.services.scheme_index.SchemeIndex)
+        self.scheme_index = scheme_index
+
+        # Token-budgeted prompt assembly (RAG_PROMPT_TOKEN_BUDGET)
+        self.prompt_builder = PromptBuilder()
+
 
 
     # ---------------- Gemini functions ----------------
     def search_schemes(self, query, language="English", user_profile=None):
         """Enhanced RAG with vectorized scheme search"""
-        # Get vectorized schemes from backend
-        relevant_schemes = self._get_vectorized_schemes(query)
-        
-        # Enhanced government services context
-        gov_context = self._get_government_services_context()
-        
-        prompt = f"""
-        You are an Indian Government Services Assistant. Answer directly without preambles or disclaimers.
-        
-        User Query: {query}
-        Language: {language}
-        
-        Relevant Schemes Found:
-        {relevant_schemes}
-        
-        Government Services Context:
-        {gov_context}
-        
-        Instructions:
-        - Answer the query directly
-        - List relevant schemes with eligibility and benefits
-        - Include required documents and application process
-        - No introductory text or disclaimers
-        - Be concise and helpful
-        - Respond in {language}
+        prompt, _ = self.prepare_search(query, language)
+        return self.generate(prompt)
+
+    def prepare_search(self, query, language="English", history_text=None):
+        """Retrieve relevant schemes and build the answer prompt.
+
+        Returns (prompt, related_schemes) so callers can generate (or stream)
+        the answer and still report which schemes it was grounded on.
         """
-        
-        response = self.gemini_model.generate_content(prompt)
-        return response.text
+        schemes = self._retrieve_schemes(query)
+        return self.build_search_prompt(query, language, schemes, history_text)
+
+    async def prepare_search_async(self, query, language="English", history_text=None):
+        """Non-blocking prepare_search for async handlers"""
+        schemes = await self._retrieve_schemes_async(query)
+        return self.build_search_prompt(query, language, schemes, history_text)
+
+    def build_search_prompt(self, query, language, schemes, history_text=None):
+        built = self.prompt_builder.build(
+            query,
+            language,
+            schemes=schemes,
+            fallback_schemes_text=self._get_basic_schemes_data() if schemes is None else None,
+            history_text=history_text,
+        )
+        print(f"RAG prompt: ~{built.tokens}/{built.budget} tokens, "
+              f"{len(built.schemes)} schemes, sections={built.sections}")
+
+        related = [self._summarize_scheme(scheme) for scheme in built.schemes]
+        return built.text, related
+
+    def generate(self, prompt):
+        return self.llm.generate(prompt)
+
+    async def generate_async(self, prompt):
+        return await self.llm.generate_async(prompt)
+
+    def generate_stream(self, prompt):
+        """Yield text chunks as the model produces them"""
+        return self.llm.generate_stream(prompt)
+
+    def generate_stream_async(self, prompt):
+        """Async variant of generate_stream"""
+        return self.llm.generate_stream_async(prompt)
 
     def generate_form_help(self, fields, language="English"):
         """Enhanced form filling assistance"""
-        prompt = f"""
+        return self.generate(self._build_form_help_prompt(fields, language))
+
+    async def generate_form_help_async(self, fields, language="English"):
+        return await self.generate_async(self._build_form_help_prompt(fields, language))
+
+    def _build_form_help_prompt(self, fields, language):
+        return f"""
         You are a government form filling assistant for India.
         
         Form Fields: {fields}
@@ -69,8 +123,6 @@ class RAGService:
         
         Be helpful and explain in simple {language}.
         """
-        response = self.gemini_model.generate_content(prompt)
-        return response.text
     
     def get_universal_help(self, query, language="English"):
         """Universal government services helper"""
@@ -81,20 +133,120 @@ class RAGService:
     # ---------------- Helpers ----------------
     def _get_vectorized_schemes(self, query):
         """Fetch relevant schemes using vector search"""
+        schemes = self._retrieve_schemes(query)
+        if schemes is None:
+            # Fallback to basic schemes data
+            return self._get_basic_schemes_data()
+        return self._format_schemes_for_context(schemes)
+
+    def _retrieve_schemes(self, query):
+        """Relevant scheme dicts from the local index or backend; None if both fail"""
+        # Local index first: no network round trip
+        if self.scheme_index is not None and self.scheme_index.ready:
+            try:
+                schemes = self.scheme_index.search(query, k=5)
+                if schemes:
+                    return schemes
+            except Exception as e:
+                print(f"Local scheme index search failed: {e}")
+
+        if not self.backend_breaker.allow():
+            # Backend is unhealthy: fail fast instead of waiting for the timeout
+            return self._last_good_schemes(query)
+
+        start = time.perf_counter()
         try:
             response = requests.post(
                 f"{self.backend_url}/api/v1/schemes/search",
                 json={"query": query},
-                timeout=10
+                timeout=self.backend_timeout
             )
             if response.status_code == 200:
-                schemes = response.json().get("schemes", [])
-                return self._format_schemes_for_context(schemes)
+                schemes = _search_results(response.json())
+                self.backend_breaker.record(True, time.perf_counter() - start)
+                if schemes:
+                    self._remember_schemes(query, schemes)
+                return schemes
         except Exception as e:
             print(f"Vector search failed: {e}")
-        
-        # Fallback to basic schemes data
-        return self._get_basic_schemes_data()
+        self.backend_breaker.record(False, time.perf_counter() - start)
+        return self._last_good_schemes(query)
+
+    async def _retrieve_schemes_async(self, query):
+        """Async _retrieve_schemes: query embedding off the event loop, pooled HTTP client"""
+        if self.scheme_index is not None and self.scheme_index.ready:
+            try:
+                schemes = await run_in_threadpool(self.scheme_index.search, query, 5)
+                if schemes:
+                    return schemes
+            except Exception as e:
+                print(f"Local scheme index search failed: {e}")
+
+        if not self.backend_breaker.allow():
+            return self._last_good_schemes(query)
+
+        start = time.perf_counter()
+        try:
+            response = await get_http_client().post(
+                f"{self.backend_url}/api/v1/schemes/search",
+                json={"query": query},
+                timeout=self.backend_timeout
+            )
+            if response.status_code == 200:
+                schemes = _search_results(response.json())
+                self.backend_breaker.record(True, time.perf_counter() - start)
+                if schemes:
+                    self._remember_schemes(query, schemes)
+                return schemes
+        except Exception as e:
+            print(f"Vector search failed: {e}")
+        self.backend_breaker.record(False, time.perf_counter() - start)
+        return self._last_good_schemes(query)
+
+    async def retrieve_schemes_batch_async(self, queries):
+        """Retrieve for many queries at once: one embedding batch + one matrix product.
+
+        Falls back to concurrent per-query retrieval when the local index is not ready.
+        """
+        if queries and self.scheme_index is not None and self.scheme_index.ready:
+            try:
+                results = await run_in_threadpool(self.scheme_index.search_batch, queries, 5)
+                if all(results):
+                    return results
+                missing = [i for i, r in enumerate(results) if not r]
+                fetched = await asyncio.gather(*(self._retrieve_schemes_async(queries[i]) for i in missing))
+                for i, schemes in zip(missing, fetched):
+                    results[i] = schemes
+                return results
+            except Exception as e:
+                print(f"Local batch scheme search failed: {e}")
+        return list(await asyncio.gather(*(self._retrieve_schemes_async(q) for q in queries)))
+
+    def _remember_schemes(self, query, schemes):
+        """Keep the last good backend result per query for use while the circuit is open"""
+        key = normalize_query(query)
+        with self._last_good_lock:
+            self._last_good[key] = schemes
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.last_good_size:
+                self._last_good.popitem(last=False)
+
+    def _last_good_schemes(self, query):
+        """Last good result for this query, or None (caller falls back to basic data)"""
+        with self._last_good_lock:
+            return self._last_good.get(normalize_query(query))
+
+    def _summarize_scheme(self, scheme):
+        """Compact scheme reference for ChatResponse.related_schemes"""
+        summary = {
+            "id": scheme.get("_id"),
+            "name": scheme.get("name"),
+            "state": scheme.get("state"),
+            "level": scheme.get("level"),
+            "source_url": scheme.get("source_url"),
+            "score": scheme.get("score"),
+        }
+        return {k: v for k, v in summary.items() if v not in (None, "")}
     
     def _format_schemes_for_context(self, schemes):
         """Format schemes data for AI context"""
@@ -114,51 +266,10 @@ class RAGService:
         return "\n".join(formatted)
     
     def _get_government_services_context(self):
-        """Universal government services knowledge base"""
-        return """
-        INSURANCE SERVICES:
-        - Pradhan Mantri Jeevan Jyoti Bima Yojana (Life Insurance - ₹2 lakh)
-        - Pradhan Mantri Suraksha Bima Yojana (Accident Insurance - ₹2 lakh)
-        - Pradhan Mantri Fasal Bima Yojana (Crop Insurance)
-        - Ayushman Bharat (Health Insurance - ₹5 lakh)
-        
-        HEALTHCARE SERVICES:
-        - AIIMS hospitals and government medical colleges
-        - Primary Health Centers (PHCs) and Community Health Centers
-        - Jan Aushadhi stores for affordable medicines
-        - National Health Mission programs
-        
-        EDUCATION & SCHOLARSHIPS:
-        - National Scholarship Portal (scholarships.gov.in)
-        - PM YASASVI Scheme for OBC/EBC/DNT students
-        - Post Matric Scholarship for SC/ST/OBC
-        - Merit-cum-Means Scholarship
-        
-        EMPLOYMENT & SKILLS:
-        - MGNREGA (100 days guaranteed employment)
-        - Pradhan Mantri Kaushal Vikas Yojana (Skill Development)
-        - Startup India and Stand Up India
-        - Rozgar Mela (Government job fairs)
-        
-        DIGITAL SERVICES:
-        - Aadhaar services and updates
-        - PAN card application and services
-        - Passport services (passportindia.gov.in)
-        - Driving license and vehicle registration
-        - Income/caste/domicile certificates
-        
-        FINANCIAL SERVICES:
-        - Jan Dhan Yojana (Bank accounts)
-        - PM Mudra Yojana (Business loans)
-        - Kisan Credit Card
-        - Direct Benefit Transfer (DBT)
-        
-        SOCIAL WELFARE:
-        - Public Distribution System (PDS/Ration)
-        - Widow pension schemes
-        - Disability pension and certificates
-        - Senior citizen benefits
-        """
+        """Universal government services knowledge base (all sections)"""
+        return "\n\n".join(
+            f"{title}:\n{text}" for title, (_, text) in SERVICE_CONTEXT_SECTIONS.items()
+        )
     
     def _get_basic_schemes_data(self):
         """Fallback schemes data when vector search fails"""
@@ -0,0 +1,160 @@
+import os
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_query(text):
+    """Casefold, drop punctuation/symbols and collapse whitespace (script-agnostic)"""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return " ".join(text.split())
+
+
+def cache_key(query, language):
+    """Cache/coalescing key for a chat query"""
+    return f"{(language or 'English').casefold()}::{normalize_query(query)}"
+
+
+class ResponseCache:
+    """Bounded LRU + TTL cache for chat responses.
+
+    Exact tier: keyed on normalized query text + language.
+    Semantic tier (optional): when an `embed_fn` is given, a miss on the exact tier
+    falls back to the most similar cached query in the same language, if its cosine
+    similarity is above `similarity_threshold`.
+    """
+
+    def __init__(self, max_size=None, ttl_seconds=None, similarity_threshold=None, embed_fn=None):
+        self.max_size = int(max_size if max_size is not None else os.getenv("CHAT_CACHE_SIZE", 1000))
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else os.getenv("CHAT_CACHE_TTL", 3600))
+        self.similarity_threshold = float(
+            similarity_threshold if similarity_threshold is not None else os.getenv("CHAT_CACHE_SIMILARITY", 0.92)
+        )
+        self.embed_fn = embed_fn
+
+        # key -> {"value", "expires_at", "language", "vector"}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, query, language="English"):
+        """Return the cached value for this query, or None on a miss"""
+        return self.lookup(query, language)[0]
+
+    def lookup(self, query, language="English"):
+        """(cached value or None, query embedding or None).
+
+        On a semantic-tier miss the embedding computed for the lookup is
+        returned, so the caller can hand it to `put` instead of embedding the
+        same query again.
+        """
+        key = cache_key(query, language)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["value"], None
+                del self._entries[key]
+                self.expirations += 1
+
+        vector = None
+        if self.embed_fn is not None:
+            try:
+                vector = self.embed_fn(query)
+            except Exception as e:
+                print(f"Cache embedding failed: {e}")
+            if vector is not None:
+                value = self._semantic_get(vector, language, now)
+                if value is not None:
+                    return value, vector
+
+        with self._lock:
+            self.misses += 1
+        return None, vector
+
+    def _semantic_get(self, vector, language, now):
+        """Nearest-neighbour lookup over cached query embeddings"""
+        import numpy as np
+
+        language = (language or "English").casefold()
+        with self._lock:
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry["vector"] is not None
+                and entry["language"] == language
+                and entry["expires_at"] > now
+            ]
+            if not candidates:
+                return None
+
+            matrix = np.stack([entry["vector"] for _, entry in candidates])
+            scores = matrix @ vector
+            best = int(scores.argmax())
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            return entry["value"]
+
+    def put(self, query, language, value, version=None, vector=None):
+        """Store a value; dropped if the cache was invalidated since `version` was read.
+
+        `vector` is the query embedding from `lookup`, if the caller has it.
+        """
+        key = cache_key(query, language)
+        if vector is None and self.embed_fn is not None:
+            try:
+                vector = self.embed_fn(query)
+            except Exception as e:
+                print(f"Cache embedding failed: {e}")
+
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = {
+                "value": value,
+                "expires_at": time.monotonic() + self.ttl_seconds,
+                "language": (language or "English").casefold(),
+                "vector": vector,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry, e.g. after scheme data changed"""
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "semantic": self.embed_fn is not None,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "version": self.version,
+            }
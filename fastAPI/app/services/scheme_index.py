@@ -0,0 +1,412 @@
+import os
+import json
+import time
+import shutil
+import threading
+import requests
+import numpy as np
+
+
+def build_text_for_embedding(scheme):
+    """Mirror of buildTextForEmbedding in the Node scheme controller"""
+    eligibility = scheme.get("eligibility") or ""
+    if not isinstance(eligibility, str):
+        eligibility = json.dumps(eligibility)
+    benefits = scheme.get("benefits") or ""
+    if not isinstance(benefits, str):
+        benefits = benefits.get("description", "") if isinstance(benefits, dict) else ""
+    faq = scheme.get("faq") or []
+    faq_text = ". ".join(f"{q.get('question', '')} {q.get('answer', '')}" for q in faq if isinstance(q, dict))
+
+    parts = [
+        scheme.get("name") or "",
+        scheme.get("acronym") or "",
+        scheme.get("overview") or "",
+        eligibility,
+        benefits,
+        scheme.get("documents") or "",
+        scheme.get("apply") or "",
+        ", ".join(scheme.get("tags") or []),
+        faq_text,
+    ]
+    return ". ".join(p for p in parts if p)
+
+
+def _snapshot_version(name):
+    """Creation time (ns) encoded in a snapshot directory name, v<ns>-<pid>-<thread>"""
+    try:
+        return int(name[1:].split("-", 1)[0])
+    except ValueError:
+        return -1
+
+
+class SchemeIndex:
+    """In-process vector index over scheme embeddings.
+
+    Embeddings live in a memory-mapped float32 matrix (`embeddings.npy`) next to a
+    JSON metadata file; search is a single matrix-vector product. Each snapshot is
+    written to its own directory and published by replacing the `CURRENT` pointer,
+    so workers refreshing concurrently never mmap a half-written or mismatched
+    matrix/metadata pair. For large
+    catalogues an IVF (inverted file) mode probes only the nearest k-means clusters.
+    """
+
+    def __init__(self, snapshot_dir=None, backend_url=None, embed_fn=None, embed_batch_fn=None):
+        self.snapshot_dir = snapshot_dir or os.getenv("SCHEME_INDEX_DIR", "data/scheme_index")
+        self.backend_url = backend_url or os.getenv("BACKEND_URL", "http://localhost:5000")
+        # unique_schemes, the collection the backend's /schemes/search vector search queries
+        self.source_path = os.getenv("SCHEME_INDEX_SOURCE_PATH", "/api/v1/schemes/catalogue")
+        self.page_size = int(os.getenv("SCHEME_INDEX_PAGE_SIZE", 100))
+        self.refresh_seconds = float(os.getenv("SCHEME_INDEX_REFRESH_SECONDS", 600))
+        self.retry_seconds = float(os.getenv("SCHEME_INDEX_RETRY_SECONDS", 15))
+
+        # "flat", "ivf" or "auto" (ivf once the catalogue exceeds ivf_min_size)
+        self.mode = os.getenv("SCHEME_INDEX_MODE", "auto").lower()
+        self.ivf_min_size = int(os.getenv("SCHEME_INDEX_IVF_MIN_SIZE", 20000))
+        self.ivf_nprobe = int(os.getenv("SCHEME_INDEX_IVF_NPROBE", 8))
+
+        self.embed_fn = embed_fn
+        self.embed_batch_fn = embed_batch_fn
+
+        # Swapped atomically on refresh so readers never see a half-built index
+        self._state = {"matrix": None, "schemes": [], "ivf": None}
+        self._refresh_lock = threading.Lock()
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_refresh = None
+        self.last_error = None
+        self.consecutive_failures = 0
+
+    # ---------------- Public API ----------------
+    @property
+    def ready(self):
+        return self._state["matrix"] is not None and len(self._state["schemes"]) > 0
+
+    def __len__(self):
+        return len(self._state["schemes"])
+
+    def all_schemes(self):
+        """Snapshot of the indexed scheme metadata"""
+        return list(self._state["schemes"])
+
+    def on_change(self, callback):
+        """Register a callback fired after the index content changes"""
+        self._listeners.append(callback)
+
+    def search(self, query, k=5):
+        """Embed the query and return the top-k schemes (dicts with a `score`)"""
+        if not self.ready or self.embed_fn is None:
+            return []
+        return self.search_vector(self.embed_fn(query), k)
+
+    def search_batch(self, queries, k=5):
+        """Top-k schemes for each query, embedding all queries in one batch"""
+        if not queries or not self.ready or self.embed_batch_fn is None:
+            return [[] for _ in queries]
+        return self.search_vectors(self.embed_batch_fn(list(queries)), k)
+
+    def search_vectors(self, vectors, k=5):
+        """Batched search_vector: one (queries x schemes) matrix product in flat mode"""
+        state = self._state
+        matrix, schemes, ivf = state["matrix"], state["schemes"], state["ivf"]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if matrix is None or not schemes:
+            return [[] for _ in range(len(vectors))]
+        if ivf is not None:
+            return [self.search_vector(vector, k) for vector in vectors]
+
+        scores = vectors @ np.asarray(matrix).T
+        results = []
+        for row_scores in scores:
+            top = self._top_k(row_scores, k)
+            results.append([dict(schemes[row], score=float(row_scores[row])) for row in top])
+        return results
+
+    def search_vector(self, vector, k=5):
+        state = self._state
+        matrix, schemes, ivf = state["matrix"], state["schemes"], state["ivf"]
+        if matrix is None or not schemes:
+            return []
+
+        vector = np.asarray(vector, dtype=np.float32)
+        if ivf is not None:
+            candidates = self._ivf_candidates(ivf, vector)
+            scores = matrix[candidates] @ vector
+        else:
+            candidates = None
+            scores = matrix @ vector
+
+        top = self._top_k(scores, k)
+        if candidates is not None:
+            rows = candidates[top]
+        else:
+            rows = top
+        return [dict(schemes[row], score=float(scores[i])) for i, row in zip(top, rows)]
+
+    def stats(self):
+        state = self._state
+        return {
+            "ready": self.ready,
+            "size": len(state["schemes"]),
+            "dim": int(state["matrix"].shape[1]) if state["matrix"] is not None else None,
+            "mode": "ivf" if state["ivf"] is not None else "flat",
+            "last_refresh": self.last_refresh,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "refresh_thread_alive": self._thread is not None and self._thread.is_alive(),
+        }
+
+    # ---------------- Snapshot ----------------
+    def load(self):
+        """Load the current on-disk snapshot (memory-mapped); returns False if none exists"""
+        directory = self._current_snapshot()
+        if directory is None:
+            return False
+        matrix_path = os.path.join(directory, "embeddings.npy")
+        meta_path = os.path.join(directory, "schemes.json")
+
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                schemes = json.load(f)
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.shape[0] != len(schemes):
+                print(f"Scheme index snapshot is inconsistent ({matrix.shape[0]} rows, {len(schemes)} schemes)")
+                return False
+        except Exception as e:
+            print(f"Failed to load scheme index snapshot: {e}")
+            return False
+
+        self._swap(matrix, schemes)
+        print(f"✅ Loaded scheme index snapshot: {len(schemes)} schemes")
+        self._notify()
+        return True
+
+    def save(self, matrix, schemes):
+        """Write a snapshot into a fresh directory, publish it, then re-open it memory-mapped"""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        version = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        directory = os.path.join(self.snapshot_dir, f"v{version}")
+        os.makedirs(directory)
+
+        with open(os.path.join(directory, "embeddings.npy"), "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(os.path.join(directory, "schemes.json"), "w", encoding="utf-8") as f:
+            json.dump(schemes, f, ensure_ascii=False)
+
+        mapped = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+
+        pointer = os.path.join(self.snapshot_dir, "CURRENT")
+        tmp = f"{pointer}.{version}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(directory))
+        os.replace(tmp, pointer)
+        self._prune_snapshots()
+        return mapped
+
+    def _current_snapshot(self):
+        """Directory the CURRENT pointer names, or None"""
+        try:
+            with open(os.path.join(self.snapshot_dir, "CURRENT"), "r", encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        directory = os.path.join(self.snapshot_dir, name)
+        return directory if name and os.path.isdir(directory) else None
+
+    def _prune_snapshots(self, keep=3, grace_seconds=300):
+        """Delete snapshot directories older than the published one, keeping the newest `keep`.
+
+        Directories younger than `grace_seconds` are left alone: another worker
+        may still be writing them. Workers that mmap'd a deleted snapshot keep
+        reading it until they reload (unlinked files stay valid while mapped).
+        """
+        current = self._current_snapshot()
+        if current is None:
+            return
+        current_version = _snapshot_version(os.path.basename(current))
+        older = sorted(
+            (name for name in os.listdir(self.snapshot_dir)
+             if name.startswith("v") and _snapshot_version(name) < current_version),
+            key=_snapshot_version,
+        )
+        now = time.time()
+        for name in older[:max(0, len(older) - (keep - 1))]:
+            directory = os.path.join(self.snapshot_dir, name)
+            try:
+                if now - os.path.getmtime(directory) < grace_seconds:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+
+    # ---------------- Refresh ----------------
+    def refresh(self):
+        """Pull schemes from the backend and re-embed only new/changed ones.
+
+        Returns True if the index content changed. Never raises: a failure
+        (backend, embedder, bad data) is recorded in `last_error` and the
+        current index keeps serving.
+        """
+        try:
+            with self._refresh_lock:
+                changed = self._refresh()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.consecutive_failures += 1
+            print(f"Scheme index refresh failed: {e}")
+            return False
+        self.consecutive_failures = 0
+        if changed:
+            self._notify()
+        return changed
+
+    def _refresh(self):
+        """One refresh under the lock; raises on failure"""
+        remote = self._fetch_all_schemes()
+
+        state = self._state
+        current = {}
+        if state["matrix"] is not None:
+            for row, scheme in enumerate(state["schemes"]):
+                current[scheme.get("_id")] = (scheme, row)
+
+        schemes, vectors, to_embed = [], [], []
+        for raw in remote:
+            scheme_id = raw.get("_id")
+            if scheme_id is None or raw.get("isActive") is False:
+                continue
+            embedding = raw.pop("embedding", None)
+            scheme = raw
+
+            existing = current.get(scheme_id)
+            if existing and existing[0].get("updatedAt") == scheme.get("updatedAt"):
+                vectors.append(np.asarray(state["matrix"][existing[1]], dtype=np.float32))
+            elif embedding:
+                vectors.append(np.asarray(embedding, dtype=np.float32))
+            else:
+                vectors.append(None)
+                to_embed.append(len(schemes))
+            schemes.append(scheme)
+
+        if to_embed:
+            if self.embed_batch_fn is None:
+                raise RuntimeError("Schemes without embeddings and no local embedder configured")
+            embedded = self.embed_batch_fn([build_text_for_embedding(schemes[i]) for i in to_embed])
+            for i, vector in zip(to_embed, embedded):
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+
+        # Drop rows whose dimension does not match the majority (e.g. stale embeddings)
+        if vectors:
+            dims = [v.shape[0] for v in vectors]
+            dim = max(set(dims), key=dims.count)
+            keep = [i for i, v in enumerate(vectors) if v.shape[0] == dim]
+            schemes = [schemes[i] for i in keep]
+            vectors = [vectors[i] for i in keep]
+
+        changed = (
+            len(schemes) != len(state["schemes"])
+            or bool(to_embed)
+            or any(
+                current.get(s.get("_id")) is None
+                or current[s.get("_id")][0].get("updatedAt") != s.get("updatedAt")
+                for s in schemes
+            )
+        )
+        self.last_refresh = time.time()
+        self.last_error = None
+        if not changed:
+            return False
+
+        if schemes:
+            matrix = np.stack(vectors)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.maximum(norms, 1e-12)
+            matrix = self.save(matrix, schemes)
+        else:
+            matrix = None
+        self._swap(matrix, schemes)
+        print(f"🔄 Scheme index refreshed: {len(schemes)} schemes ({len(to_embed)} embedded locally)")
+
+        return True
+
+    def start_background_refresh(self):
+        """Refresh periodically on a daemon thread; failures retry with exponential backoff"""
+        def loop():
+            while not self._stop.is_set():
+                self.refresh()
+                delay = self.refresh_seconds
+                if self.consecutive_failures:
+                    delay = min(self.refresh_seconds, self.retry_seconds * 2 ** (self.consecutive_failures - 1))
+                self._stop.wait(delay)
+
+        self._thread = threading.Thread(target=loop, name="scheme-index-refresh", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------------- Helpers ----------------
+    def _fetch_all_schemes(self):
+        schemes, page, total_pages = [], 1, 1
+        while page <= total_pages:
+            response = requests.get(
+                f"{self.backend_url}{self.source_path}",
+                params={"page": page, "limit": self.page_size},
+                timeout=30,
+            )
+            response.raise_for_status()
+            data = response.json()
+            schemes.extend(data.get("schemes", []))
+            total_pages = int(data.get("totalPages", 1) or 1)
+            page += 1
+        return schemes
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Scheme index listener failed: {e}")
+
+    def _swap(self, matrix, schemes):
+        ivf = None
+        if matrix is not None and (
+            self.mode == "ivf" or (self.mode == "auto" and len(schemes) >= self.ivf_min_size)
+        ):
+            ivf = self._build_ivf(np.asarray(matrix))
+        self._state = {"matrix": matrix, "schemes": schemes, "ivf": ivf}
+
+    def _build_ivf(self, matrix, iterations=10):
+        """Spherical k-means coarse quantizer with ~sqrt(n) lists"""
+        n = matrix.shape[0]
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(0)
+        centroids = matrix[rng.choice(n, nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = (matrix @ centroids.T).argmax(axis=1)
+            for c in range(nlist):
+                members = matrix[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        assign = (matrix @ centroids.T).argmax(axis=1)
+        lists = [np.flatnonzero(assign == c) for c in range(nlist)]
+        return {"centroids": centroids, "lists": lists}
+
+    def _ivf_candidates(self, ivf, vector):
+        centroid_scores = ivf["centroids"] @ vector
+        nprobe = min(self.ivf_nprobe, len(ivf["lists"]))
+        probes = self._top_k(centroid_scores, nprobe)
+        return np.concatenate([ivf["lists"][p] for p in probes])
+
+    @staticmethod
+    def _top_k(scores, k):
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return np.array([], dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
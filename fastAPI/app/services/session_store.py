@@ -0,0 +1,231 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from app.chat_models import ConversationContext
+from app.utils.sqlite_db import SQLiteDatabase
+
+
+class SessionBackend:
+    """Persistent tier for SessionStore (sessions survive restarts / LRU eviction).
+
+    The backend is the source of truth when several workers share it: `save`
+    returns the stored timestamp, and `load(session_id, newer_than)` returns
+    None for an unknown session, otherwise (context, saved_at) with context
+    None when the stored copy is not newer than `newer_than`.
+    """
+
+    def load(self, session_id, newer_than=None):
+        raise NotImplementedError
+
+    def save(self, context):
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Stores ConversationContext JSON in a local SQLite file (shared by workers)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SESSION_DB_PATH", "data/sessions.db")
+        self.db = SQLiteDatabase(
+            self.path,
+            schema=["CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"],
+        )
+        self.db.connection()
+
+    def load(self, session_id, newer_than=None):
+        row = self.db.execute(
+            "SELECT CASE WHEN updated_at > ? THEN data END, updated_at FROM sessions WHERE id = ?",
+            (newer_than if newer_than is not None else -1.0, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        data, saved_at = row
+        return (ConversationContext.model_validate_json(data) if data is not None else None), saved_at
+
+    def save(self, context):
+        saved_at = time.time()
+        self.db.write(
+            "INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+            (context.session_id, context.model_dump_json(), saved_at),
+        )
+        return saved_at
+
+    def delete(self, session_id):
+        self.db.write("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class SessionStore:
+    """Bounded per-session conversation memory.
+
+    In-memory LRU with TTL in front of an optional persistent backend. With a
+    backend, every lookup asks it for a newer copy (one indexed read), so
+    workers sharing the SQLite file never serve or overwrite stale turns. Each
+    session keeps its last `max_turns` messages verbatim; older messages are
+    folded into a short rolling summary so prompts stay compact.
+    """
+
+    def __init__(self, max_sessions=None, ttl_seconds=None, max_turns=None, backend=None):
+        self.max_sessions = int(
+            max_sessions if max_sessions is not None else os.getenv("SESSION_MAX_SESSIONS", 50000)
+        )
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else os.getenv("SESSION_TTL", 1800))
+        self.max_turns = int(max_turns if max_turns is not None else os.getenv("SESSION_MAX_TURNS", 6))
+        self.max_message_chars = int(os.getenv("SESSION_MAX_MESSAGE_CHARS", 400))
+        self.max_summary_chars = int(os.getenv("SESSION_SUMMARY_CHARS", 600))
+        self.backend = backend
+
+        self._sessions = OrderedDict()  # session_id -> ConversationContext
+        self._saved_at = {}  # session_id -> backend timestamp of the in-memory copy
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.backend_loads = 0
+
+    def get(self, session_id):
+        """Return the live context for a session, or None"""
+        now = datetime.utcnow()
+        with self._lock:
+            context = self._sessions.get(session_id)
+            if context is not None and (now - context.updated_at).total_seconds() > self.ttl_seconds:
+                self._forget(session_id)
+                self.expirations += 1
+                context = None
+            if context is not None:
+                self._sessions.move_to_end(session_id)
+            saved_at = self._saved_at.get(session_id) if context is not None else None
+
+        if self.backend is None:
+            return context
+        try:
+            loaded = self.backend.load(session_id, newer_than=saved_at)
+        except Exception as e:
+            print(f"Session load failed: {e}")
+            return context
+        if loaded is None:
+            # Deleted (or never saved) by any worker
+            if context is not None:
+                with self._lock:
+                    self._forget(session_id)
+            return None
+        stored, saved_at = loaded
+        if stored is None:
+            # Nothing newer in the backend: the memory copy is current
+            return context
+        if (now - stored.updated_at).total_seconds() > self.ttl_seconds:
+            return None
+
+        with self._lock:
+            self.backend_loads += 1
+            self._insert(stored)
+            self._saved_at[session_id] = saved_at
+        return stored
+
+    def get_or_create(self, session_id, user_id=None):
+        context = self.get(session_id)
+        if context is None:
+            context = ConversationContext(session_id=session_id, user_id=user_id)
+            with self._lock:
+                self.created += 1
+                self._insert(context)
+        return context
+
+    def append_turn(self, session_id, user_message, assistant_message, intent=None, user_id=None):
+        """Record one exchange, folding old messages into the summary (`user_id` owns new sessions)"""
+        context = self.get_or_create(session_id, user_id)
+        with self._lock:
+            history = context.conversation_history
+            history.append({"role": "user", "content": self._clip(user_message)})
+            history.append({"role": "assistant", "content": self._clip(assistant_message)})
+
+            overflow = len(history) - self.max_turns
+            if overflow > 0:
+                folded, context.conversation_history = history[:overflow], history[overflow:]
+                context.summary = self._fold(context.summary, folded)
+
+            if intent:
+                context.current_intent = intent
+            context.updated_at = datetime.utcnow()
+
+        if self.backend is not None:
+            try:
+                saved_at = self.backend.save(context)
+                with self._lock:
+                    self._saved_at[session_id] = saved_at
+            except Exception as e:
+                print(f"Session save failed: {e}")
+        return context
+
+    def history_text(self, context):
+        """Compact prompt block: rolling summary + recent messages"""
+        if context is None:
+            return ""
+        lines = []
+        if context.summary:
+            lines.append(f"Earlier: {context.summary}")
+        for message in context.conversation_history:
+            role = "User" if message.get("role") == "user" else "Assistant"
+            lines.append(f"{role}: {message.get('content', '')}")
+        return "\n".join(lines)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._forget(session_id)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "backend_loads": self.backend_loads,
+            }
+
+    # ---------------- Helpers ----------------
+    def _insert(self, context):
+        self._sessions[context.session_id] = context
+        self._sessions.move_to_end(context.session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._saved_at.pop(evicted, None)
+            self.evictions += 1
+
+    def _forget(self, session_id):
+        self._sessions.pop(session_id, None)
+        self._saved_at.pop(session_id, None)
+
+    def _clip(self, text):
+        text = " ".join((text or "").split())
+        if len(text) > self.max_message_chars:
+            text = text[:self.max_message_chars].rsplit(" ", 1)[0] + "..."
+        return text
+
+    def _fold(self, summary, messages):
+        """Extractive rolling summary: keep the user's earlier questions, newest last"""
+        asked = [m["content"][:120] for m in messages if m.get("role") == "user"]
+        if not asked:
+            return summary
+        combined = "; ".join(filter(None, [summary] + asked))
+        if len(combined) > self.max_summary_chars:
+            combined = "..." + combined[-self.max_summary_chars:]
+        return combined
+
+
+def create_session_store():
+    """SessionStore configured from SESSION_BACKEND ("memory" or "sqlite")"""
+    backend_name = os.getenv("SESSION_BACKEND", "memory").lower()
+    backend = SQLiteSessionBackend() if backend_name == "sqlite" else None
+    return SessionStore(backend=backend)
@@ -0,0 +1,156 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from app.utils.sqlite_db import SQLiteDatabase
+
+
+def normalize_text(text):
+    """NFC + collapsed whitespace; case and punctuation matter for translation"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def translation_key(text, src_lang, tgt_lang, model_id):
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_id}|{src_lang}|{tgt_lang}|{digest}"
+
+
+class TranslationCache:
+    """Two-tier translation cache: bounded in-memory LRU over a SQLite store.
+
+    Keys are (sha256 of normalized text, source lang, target lang, model id),
+    so IndicTrans sentences and Gemini translations share one store without
+    colliding. The SQLite file survives restarts and is shared by all workers
+    on the host (WAL mode); disk hits are promoted into the memory tier.
+    The lock only guards the memory tier: SQLite reads and writes run on
+    per-thread connections outside it.
+    """
+
+    def __init__(self, max_size=None, path=None):
+        self.max_size = int(max_size if max_size is not None else os.getenv("TRANSLATION_CACHE_SIZE", 10000))
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.db = None
+        if path:
+            self.db = SQLiteDatabase(
+                path,
+                schema=[
+                    "CREATE TABLE IF NOT EXISTS translations "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                ],
+                pragmas=("journal_mode=WAL", "synchronous=NORMAL"),
+            )
+            self.db.connection()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, texts, src_lang, tgt_lang, model_id):
+        """Cached translations aligned with `texts` (None where missing)"""
+        keys = [translation_key(t, src_lang, tgt_lang, model_id) for t in texts]
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = value
+                    self.hits += 1
+                else:
+                    missing.append(i)
+
+        found = {}
+        if missing and self.db:
+            wanted = list({keys[i] for i in missing})
+            try:
+                for start in range(0, len(wanted), 500):
+                    chunk = wanted[start:start + 500]
+                    rows = self.db.execute(
+                        f"SELECT key, value FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    found.update(rows)
+            except sqlite3.Error as e:
+                print(f"Translation cache read failed: {e}")
+
+        with self._lock:
+            for key, value in found.items():
+                self._insert(key, value)
+            for i in missing:
+                if keys[i] in found:
+                    results[i] = found[keys[i]]
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return results
+
+    def get(self, text, src_lang, tgt_lang, model_id):
+        return self.get_many([text], src_lang, tgt_lang, model_id)[0]
+
+    def put_many(self, texts, values, src_lang, tgt_lang, model_id):
+        rows = [
+            (translation_key(t, src_lang, tgt_lang, model_id), v, time.time())
+            for t, v in zip(texts, values) if v
+        ]
+        with self._lock:
+            for key, value, _ in rows:
+                self._insert(key, value)
+        if rows and self.db:
+            try:
+                self.db.write_many(
+                    "INSERT OR REPLACE INTO translations (key, value, created_at) VALUES (?, ?, ?)", rows
+                )
+            except sqlite3.Error as e:
+                print(f"Translation cache write failed: {e}")
+
+    def put(self, text, value, src_lang, tgt_lang, model_id):
+        self.put_many([text], [value], src_lang, tgt_lang, model_id)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "persistent": self.path,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _insert(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# One cache per process, shared by the IndicTrans translator and TranslationService
+_cache = None
+
+
+def get_translation_cache():
+    """Shared TranslationCache configured from TRANSLATION_CACHE_BACKEND ("sqlite" or "memory")"""
+    global _cache
+    if _cache is None:
+        path = None
+        if os.getenv("TRANSLATION_CACHE_BACKEND", "sqlite").lower() == "sqlite":
+            path = os.getenv("TRANSLATION_CACHE_PATH", "data/translation_cache.db")
+        try:
+            _cache = TranslationCache(path=path)
+        except sqlite3.Error as e:
+            print(f"❌ Translation cache store unavailable, memory only: {e}")
+            _cache = TranslationCache()
+    return _cache
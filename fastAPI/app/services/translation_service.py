@@ -1,12 +1,23 @@
-import google.generativeai as genai
 import os
+from fastapi.concurrency import run_in_threadpool
+from app.services.llm_provider import get_llm_provider
+from app.services.translation_cache import get_translation_cache
+from app.services.language_detector import get_language_detector
 
 class TranslationService:
     def __init__(self):
         # Use Gemini for translation instead of googletrans
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.llm = get_llm_provider(os.getenv("TRANSLATION_MODEL", "gemini-2.0-flash-exp"))
         
+        self.cache = get_translation_cache()
+        self.model_id = getattr(self.llm, "model_name", self.llm.name)
+        self.language_detector = get_language_detector()
+
+        # English -> Indic runs on the local IndicTrans model when it can; Gemini is the fallback
+        self.local_enabled = os.getenv("TRANSLATION_LOCAL", "true").lower() == "true"
+        # Set to a translation worker pool's translate_batch to run off-process
+        self.local_translate_batch = None
+
         self.lang_codes = {
             "English": "en",
             "Hindi": "hi", 
@@ -18,26 +29,112 @@ class TranslationService:
         try:
             if target_language == "English":
                 return text
-            
+
+            local = self._translate_local(text, target_language)
+            if local:
+                return local
+
+            cached = self.cache.get(text, "auto", target_language, self.model_id)
+            if cached is not None:
+                return cached
+
             prompt = f"Translate this text to {target_language}. Only respond with the translation: {text}"
-            response = self.gemini_model.generate_content(prompt)
-            return response.text.strip()
+            translated = self.llm.generate(prompt).strip()
+            self.cache.put(text, translated, "auto", target_language, self.model_id)
+            return translated
             
         except Exception as e:
             print(f"Translation error: {e}")
             return text
+
+    async def translate_text_async(self, text, target_language):
+        """Non-blocking translate_text"""
+        try:
+            if target_language == "English":
+                return text
+
+            local = await run_in_threadpool(self._translate_local, text, target_language)
+            if local:
+                return local
+
+            # The persistent tier does SQLite I/O, keep it off the event loop
+            cached = await run_in_threadpool(self.cache.get, text, "auto", target_language, self.model_id)
+            if cached is not None:
+                return cached
+
+            prompt = f"Translate this text to {target_language}. Only respond with the translation: {text}"
+            response = await self.llm.generate_async(prompt)
+            translated = response.strip()
+            await run_in_threadpool(self.cache.put, text, translated, "auto", target_language, self.model_id)
+            return translated
+
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return text
     
+    def _translate_local(self, text, target_language):
+        """IndicTrans en->indic translation, or None to use Gemini"""
+        if not self.local_enabled:
+            return None
+        from app.utils import translator
+
+        tgt_lang = translator.lang_code(target_language)
+        if tgt_lang is None or tgt_lang == translator.TGT_LANG:
+            return None
+        translate_batch = self.local_translate_batch
+        if translate_batch is None:
+            if not translator.registry.available("en-indic"):
+                return None
+            translate_batch = translator.translate_batch
+        # The local model only translates from English
+        letters = [ch for ch in text if ch.isalpha()]
+        if not letters or sum(ch.isascii() for ch in letters) < 0.8 * len(letters):
+            return None
+        try:
+            return translate_batch(
+                [text], translator.TGT_LANG, translator.choose_profile(text), tgt_lang=tgt_lang
+            )[0]
+        except Exception as e:
+            print(f"Local translation failed, using Gemini: {e}")
+            return None
+
     def detect_language(self, text):
-        """Detect language using Gemini"""
+        """Detect language locally (script histogram + romanized Hindi model)"""
+        return self.language_detector.detect(text)[0]
+
+    async def detect_language_async(self, text):
+        """Detection is local and takes microseconds; kept async for existing callers"""
+        return self.detect_language(text)
+
+    def detect_languages(self, texts):
+        """(language, script, confidence) for each text"""
+        return self.language_detector.detect_batch(texts)
+
+    def is_romanized(self, text):
+        """Indic language written in Latin script (e.g. "mujhe pension chahiye")"""
+        language, script, _ = self.language_detector.detect(text)
+        return script == "Latin" and language != "English"
+
+    async def translate_romanized_async(self, text):
+        """English translation of romanized Indic text via the LLM.
+
+        IndicTrans only reads native scripts, so Latin-script Hindi goes to
+        Gemini instead of being mis-tagged as Devanagari.
+        """
         try:
-            prompt = f"Detect the language of this text and respond with only 'English', 'Hindi', or 'Bengali': {text}"
-            response = self.gemini_model.generate_content(prompt)
-            detected = response.text.strip()
-            
-            if detected in ["English", "Hindi", "Bengali"]:
-                return detected
-            return "English"
-            
+            cached = await run_in_threadpool(self.cache.get, text, "hin_Latn", "English", self.model_id)
+            if cached is not None:
+                return cached
+
+            prompt = (
+                "This is Hindi written in Latin script. Translate it to English. "
+                f"Only respond with the translation: {text}"
+            )
+            response = await self.llm.generate_async(prompt)
+            translated = response.strip()
+            await run_in_threadpool(self.cache.put, text, translated, "hin_Latn", "English", self.model_id)
+            return translated
+
         except Exception as e:
-            print(f"Language detection error: {e}")
-            return "English"
+            print(f"Translation error: {e}")
+            return text
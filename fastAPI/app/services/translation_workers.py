@@ -0,0 +1,238 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+
+def _worker_main(index, tasks, results, threads, cpus, preload):
+    """Translation worker process: pinned cores, own torch thread pool, models loaded once"""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # Must be set before torch initialises its thread pools
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    import torch
+    torch.set_num_threads(threads)
+    from app.utils import translator
+
+    translator.preload_models(preload)
+    results.put(("ready", index, os.getpid()))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, texts, src_lang, profile, tgt_lang = task
+        start = time.perf_counter()
+        try:
+            out = translator.translate_batch(texts, src_lang, profile, tgt_lang=tgt_lang)
+            results.put(("result", index, task_id, out, None, time.perf_counter() - start))
+        except Exception as e:
+            results.put(("result", index, task_id, None, f"{type(e).__name__}: {e}", time.perf_counter() - start))
+
+
+class TranslationWorkerPool:
+    """Pool of IndicTrans worker processes fed through per-worker queues.
+
+    Each worker is a spawned process with its own torch thread count and,
+    optionally, its own slice of CPU cores, so long `generate` calls never
+    compete with the API process. Batches go to the worker with the fewest
+    in-flight tasks; a collector thread resolves results and restarts
+    workers that die (failing their in-flight tasks). The pool is per API
+    process: run one API worker per node when using it.
+    """
+
+    def __init__(self, num_workers=None, threads_per_worker=None, affinity=None, preload=None, timeout=None):
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self.num_workers = int(num_workers if num_workers is not None else os.getenv("TRANSLATION_WORKERS", 2))
+        if self.num_workers < 1:
+            # TRANSLATION_WORKERS=0 means "no pool" and is handled by not creating one
+            raise ValueError(f"TranslationWorkerPool needs at least 1 worker, got {self.num_workers}")
+        self.threads_per_worker = int(
+            threads_per_worker or os.getenv("TRANSLATION_WORKER_THREADS", 0) or max(1, cpu_count // self.num_workers)
+        )
+        self.affinity = (
+            affinity if affinity is not None
+            else os.getenv("TRANSLATION_WORKER_AFFINITY", "true").lower() == "true"
+        )
+        self.preload = preload if preload is not None else os.getenv("TRANSLATION_PRELOAD_DIRECTIONS", "indic-en")
+        self.timeout = float(timeout if timeout is not None else os.getenv("TRANSLATION_WORKER_TIMEOUT", 120))
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers = []
+        self._pending = {}  # task_id -> (worker index, Future, submitted at)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._results = None
+        self._collector = None
+        self._running = False
+
+        self.submitted = 0
+        self.failed = 0
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        if self._running:
+            return
+        self._results = self._ctx.Queue()
+        self._running = True
+        self._workers = [self._spawn(i) for i in range(self.num_workers)]
+        self._collector = threading.Thread(target=self._collect, name="translation-results", daemon=True)
+        self._collector.start()
+        print(f"✅ Translation worker pool: {self.num_workers} x {self.threads_per_worker} threads")
+
+    def stop(self):
+        self._running = False
+        for worker in self._workers:
+            try:
+                worker["tasks"].put(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker["process"].join(timeout=5)
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for _, future, _ in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Translation worker pool stopped"))
+
+    def _cpus_for(self, index):
+        if not self.affinity or not hasattr(os, "sched_getaffinity"):
+            return None
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) < self.num_workers:
+            return None
+        per_worker = max(1, len(cpus) // self.num_workers)
+        return cpus[index * per_worker:(index + 1) * per_worker]
+
+    def _spawn(self, index, restarts=0):
+        tasks = self._ctx.Queue()
+        cpus = self._cpus_for(index)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, tasks, self._results, self.threads_per_worker, cpus, self.preload),
+            name=f"translate-{index}",
+            daemon=True,
+        )
+        process.start()
+        return {
+            "index": index,
+            "process": process,
+            "tasks": tasks,
+            "cpus": cpus,
+            "ready": False,
+            "in_flight": 0,
+            "completed": 0,
+            "errors": 0,
+            "restarts": restarts,
+            "busy_seconds": 0.0,
+        }
+
+    # ---------------- Submission ----------------
+    def submit(self, texts, src_lang, profile="quality", tgt_lang="eng_Latn"):
+        """Queue one batch on the least-loaded worker; returns a concurrent Future"""
+        future = Future()
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Translation worker pool is not running")
+            alive = [w for w in self._workers if w["process"].is_alive()] or self._workers
+            worker = min(alive, key=lambda w: (not w["ready"], w["in_flight"]))
+            task_id = next(self._ids)
+            self._pending[task_id] = (worker["index"], future, time.monotonic())
+            worker["in_flight"] += 1
+            self.submitted += 1
+        worker["tasks"].put((task_id, list(texts), src_lang, profile, tgt_lang))
+        return future
+
+    def translate_batch(self, texts, src_lang, profile="quality", tgt_lang="eng_Latn"):
+        """Blocking drop-in for translator.translate_batch (call from a thread, not the loop)"""
+        return self.submit(texts, src_lang, profile, tgt_lang).result(timeout=self.timeout)
+
+    # ---------------- Results / health ----------------
+    def _collect(self):
+        last_check = time.monotonic()
+        while self._running:
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+
+            if message is not None and message[0] == "ready":
+                _, index, pid = message
+                with self._lock:
+                    self._workers[index]["ready"] = True
+                print(f"✅ Translation worker {index} ready (pid {pid})")
+            elif message is not None and message[0] == "result":
+                _, index, task_id, out, error, seconds = message
+                with self._lock:
+                    entry = self._pending.pop(task_id, None)
+                    worker = self._workers[index]
+                    worker["in_flight"] = max(0, worker["in_flight"] - 1)
+                    worker["completed"] += 1
+                    worker["busy_seconds"] += seconds
+                    if error:
+                        worker["errors"] += 1
+                if entry is not None and not entry[1].done():
+                    if error:
+                        entry[1].set_exception(RuntimeError(error))
+                    else:
+                        entry[1].set_result(out)
+
+            if time.monotonic() - last_check >= 1.0:
+                self._check_workers()
+                last_check = time.monotonic()
+
+    def _check_workers(self):
+        """Restart dead workers and fail the tasks they were holding"""
+        if not self._running:
+            return
+        for i, worker in enumerate(list(self._workers)):
+            if worker["process"].is_alive():
+                continue
+            with self._lock:
+                lost = [tid for tid, (index, _, _) in self._pending.items() if index == i]
+                futures = [self._pending.pop(tid)[1] for tid in lost]
+                self.failed += len(futures)
+                self._workers[i] = self._spawn(i, worker["restarts"] + 1)
+            print(f"❌ Translation worker {i} exited (code {worker['process'].exitcode}), restarted")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Translation worker {i} exited"))
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            oldest = min((submitted for _, _, submitted in self._pending.values()), default=None)
+            workers = [
+                {
+                    "index": w["index"],
+                    "pid": w["process"].pid,
+                    "alive": w["process"].is_alive(),
+                    "ready": w["ready"],
+                    "cpus": w["cpus"],
+                    "in_flight": w["in_flight"],
+                    "completed": w["completed"],
+                    "errors": w["errors"],
+                    "restarts": w["restarts"],
+                    "busy_seconds": round(w["busy_seconds"], 3),
+                }
+                for w in self._workers
+            ]
+            return {
+                "running": self._running,
+                "workers": workers,
+                "healthy_workers": sum(1 for w in workers if w["alive"] and w["ready"]),
+                "threads_per_worker": self.threads_per_worker,
+                "queue_depth": len(self._pending),
+                "oldest_task_age": round(now - oldest, 3) if oldest is not None else 0.0,
+                "submitted": self.submitted,
+                "failed": self.failed,
+            }
@@ -0,0 +1,159 @@
+import io
+import os
+import shutil
+import struct
+import subprocess
+import wave
+
+
+class TTSBackend:
+    """One speech engine. Subclasses set `name`/`mime_type` and implement `synthesize`.
+
+    `voice` identifies the engine configuration in audio cache keys.
+    `stream_part` and `join` combine per-chunk outputs: byte concatenation
+    works for MP3 frames, other containers override them.
+    `slow_call_seconds` is how long one chunk may take before the engine's
+    breaker counts the call as slow.
+    """
+
+    name = ""
+    mime_type = "audio/mpeg"
+    slow_call_seconds = 5.0
+
+    @property
+    def voice(self):
+        return self.name
+
+    def available(self, lang_code):
+        raise NotImplementedError
+
+    def synthesize(self, text, lang_code):
+        """Audio bytes for one chunk of text (blocking)"""
+        raise NotImplementedError
+
+    def stream_part(self, data, first):
+        """Bytes to send for the next chunk of a streamed response"""
+        return data
+
+    def join(self, parts):
+        """One playable file from the chunk outputs, in order"""
+        return b"".join(parts)
+
+    def stats(self):
+        return {"mime_type": self.mime_type, "voice": self.voice}
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS over the network (MP3)"""
+
+    name = "gtts"
+    mime_type = "audio/mpeg"
+    # A round trip to Google per chunk; a 200-character chunk often takes 2-4s
+    slow_call_seconds = 8.0
+
+    def __init__(self, tld=None):
+        self.tld = tld or os.getenv("TTS_GTTS_TLD", "com")
+        self._languages = None
+
+    @property
+    def voice(self):
+        return f"gtts:{self.tld}"
+
+    def available(self, lang_code):
+        if self._languages is None:
+            from gtts.lang import tts_langs
+            self._languages = set(tts_langs())
+        return lang_code in self._languages
+
+    def synthesize(self, text, lang_code):
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=lang_code, tld=self.tld, slow=False)
+        fp = io.BytesIO()
+        tts.write_to_fp(fp)
+        return fp.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng on the box (WAV): no network, predictable latency, robotic voice"""
+
+    name = "espeak"
+    mime_type = "audio/wav"
+    # Local formant synthesis is far faster than real time
+    slow_call_seconds = 2.0
+
+    # espeak-ng voice per gTTS-style language code
+    VOICES = {
+        "en": "en-us",
+        "hi": "hi",
+        "bn": "bn",
+    }
+
+    def __init__(self, binary=None, rate=None, timeout=None):
+        self.binary = binary or os.getenv("TTS_ESPEAK_BIN") or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.rate = int(rate if rate is not None else os.getenv("TTS_ESPEAK_RATE", 160))
+        self.timeout = float(timeout if timeout is not None else os.getenv("TTS_ESPEAK_TIMEOUT", 30))
+
+    @property
+    def voice(self):
+        return f"espeak:{self.rate}"
+
+    def available(self, lang_code):
+        return self.binary is not None and lang_code in self.VOICES
+
+    def synthesize(self, text, lang_code):
+        result = subprocess.run(
+            [self.binary, "-v", self.VOICES[lang_code], "-s", str(self.rate), "-b", "1", "--stdin", "--stdout"],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            timeout=self.timeout,
+            check=True,
+        )
+        if not result.stdout.startswith(b"RIFF"):
+            raise RuntimeError(f"espeak-ng returned no audio: {result.stderr.decode(errors='replace')[:200]}")
+        return result.stdout
+
+    def stream_part(self, data, first):
+        # One header with an open-ended length, then raw PCM from every chunk
+        params, frames = _read_wav(data)
+        return (_wav_header(params) if first else b"") + frames
+
+    def join(self, parts):
+        out = io.BytesIO()
+        params = None
+        with wave.open(out, "wb") as wav:
+            for part in parts:
+                part_params, frames = _read_wav(part)
+                if params is None:
+                    params = part_params
+                    wav.setparams(params)
+                wav.writeframes(frames)
+        return out.getvalue()
+
+    def stats(self):
+        return {**super().stats(), "binary": self.binary}
+
+
+def _read_wav(data):
+    # espeak writes to a pipe, so the header sizes are placeholders: read what is there
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        params = wav.getparams()
+        frames = wav.readframes(wav.getnframes())
+    return params, frames
+
+
+def _wav_header(params):
+    """PCM WAV header with maximal sizes, for a stream whose length is not known yet"""
+    block_align = params.nchannels * params.sampwidth
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, params.nchannels, params.framerate,
+            params.framerate * block_align, block_align, params.sampwidth * 8
+        )
+        + b"data" + struct.pack("<I", 0xFFFFFFFF - 36)
+    )
+
+
+def create_backends():
+    """All known backends by name (availability is checked per language at call time)"""
+    return {backend.name: backend for backend in (GTTSBackend(), EspeakBackend())}
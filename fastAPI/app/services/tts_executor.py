@@ -0,0 +1,115 @@
+import os
+import math
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TTSOverloaded(Exception):
+    """Raised when the TTS queue is full; callers should answer 503 with Retry-After"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"TTS queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+    @property
+    def headers(self):
+        """Headers for the 503 response"""
+        return {"Retry-After": str(self.retry_after)}
+
+
+class TTSExecutor:
+    """Bounded thread pool for synthesis with queue/latency counters.
+
+    At most `max_queue` tasks may wait for a worker; a request whose tasks
+    do not fit is rejected as a whole with TTSOverloaded instead of queueing
+    behind a burst (an idle pool always admits, however many chunks a long
+    text has). Wait time is measured from submission to start, synthesis
+    time from start to finish.
+    """
+
+    def __init__(self, workers=None, max_queue=None):
+        self.workers = int(workers if workers is not None else os.getenv("TTS_WORKERS", 2))
+        self.max_queue = int(max_queue if max_queue is not None else os.getenv("TTS_MAX_QUEUE", 32))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def admit(self, count=1):
+        """Reserve queue slots for `count` tasks or raise TTSOverloaded"""
+        with self._lock:
+            if self.queued and self.queued + count > self.max_queue:
+                self.rejected += 1
+                raise TTSOverloaded(self._retry_after())
+            self.queued += count
+
+    def run(self, fn, *args):
+        """Schedule an admitted task; returns an asyncio future (cancel() frees its slot if not started)"""
+        future = self.executor.submit(self._call, time.perf_counter(), fn, args)
+        future.add_done_callback(self._release_cancelled)
+        return asyncio.wrap_future(future)
+
+    def submit(self, fn, *args):
+        """Admit and schedule one task"""
+        self.admit()
+        return self.run(fn, *args)
+
+    def _release_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued = max(0, self.queued - 1)
+
+    def _call(self, submitted, fn, args):
+        start = time.perf_counter()
+        with self._lock:
+            self.queued = max(0, self.queued - 1)
+            self.running += 1
+            wait = start - submitted
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.errors += failed
+                self.busy_seconds += elapsed
+                self.max_run_seconds = max(self.max_run_seconds, elapsed)
+
+    def _retry_after(self):
+        """Seconds until the current queue should have drained (at least 1)"""
+        average = self.busy_seconds / self.completed if self.completed else 1.0
+        return max(1, math.ceil(average * (self.queued + self.running) / self.workers))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "saturated": self.queued >= self.max_queue,
+                "completed": self.completed,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "avg_wait_seconds": round(self.wait_seconds / self.completed, 4) if self.completed else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 4),
+                "avg_synthesis_seconds": round(self.busy_seconds / self.completed, 4) if self.completed else 0.0,
+                "max_synthesis_seconds": round(self.max_run_seconds, 4),
+            }
@@ -1,9 +1,25 @@
-from gtts import gTTS
-import io
-import base64
 import os
+import re
+import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from app.services.audio_cache import AudioCache, audio_key, profile_key
+from app.services.audio_profiles import AUDIO_PROFILES, AudioTranscoder
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.tts_backends import create_backends
+from app.services.tts_executor import TTSExecutor, TTSOverloaded
+
+# Chunks end at danda/double danda or Latin terminal punctuation
+SENTENCE_END = re.compile(r"(?<=[।॥.?!])\s+")
+
+
+class TTSTextTooLong(Exception):
+    """Raised for texts over TTS_MAX_CHARS; callers should answer 413"""
+
+    def __init__(self, length, limit):
+        super().__init__(f"Text is {length} characters, the TTS limit is {limit}")
+        self.length = length
+        self.limit = limit
+
 
 class TTSService:
     def __init__(self):
@@ -12,36 +28,254 @@ class TTSService:
             "Hindi": "hi",
             "Bengali": "bn"
         }
-        self.executor = ThreadPoolExecutor(max_workers=2)
-    
-    def text_to_speech(self, text, language="English"):
-        """Convert text to speech and return base64 audio"""
+        # Synthesis is blocking network/subprocess work; keep it off the event loop, with a
+        # bounded queue so bursts are shed (TTSOverloaded) instead of piling up
+        self.executor = TTSExecutor()
+        # Repeated texts (scheme summaries, form help) are served from disk, not re-synthesized
+        self.cache = AudioCache()
+        # Long texts are synthesized as parallel sentence chunks instead of being truncated
+        self.chunk_chars = int(os.getenv("TTS_CHUNK_CHARS", 200))
+        # ...but one request may not fan out into an unbounded number of synthesis calls
+        self.max_chars = int(os.getenv("TTS_MAX_CHARS", 5000))
+
+        # Engines in preference order, per language (TTS_BACKENDS_HI=espeak,gtts) or global;
+        # a failing engine trips its breaker and requests fall through to the next one
+        self.backends = create_backends()
+        self.backend_order = self._backend_order(os.getenv("TTS_BACKENDS", "gtts,espeak"))
+        self.language_backends = {
+            code: self._backend_order(os.getenv(f"TTS_BACKENDS_{code.upper()}", ""))
+            for code in self.lang_codes.values()
+        }
+        # Slow-call threshold per chunk, scaled to the engine (CB_TTS_<NAME>_SLOW_CALL_SECONDS overrides)
+        self.breakers = {
+            name: CircuitBreaker(
+                f"tts_{name}",
+                slow_call_seconds=float(
+                    os.getenv(f"CB_TTS_{name.upper()}_SLOW_CALL_SECONDS", backend.slow_call_seconds)
+                ),
+            )
+            for name, backend in self.backends.items()
+        }
+
+        # Low-bitrate output profiles (AUDIO_PROFILES) are transcoded from the cached original
+        self.transcoder = AudioTranscoder()
+        if not self.transcoder.available:
+            print("⚠️ ffmpeg not found: audio profiles are served as the original audio")
+
+    def _backend_order(self, setting):
+        names = [name.strip() for name in setting.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.backends]
+        if unknown:
+            print(f"❌ Unknown TTS backends ignored: {unknown}")
+        return [name for name in names if name in self.backends]
+
+    def backends_for(self, lang_code):
+        """Backends that can speak `lang_code`, in preference order"""
+        order = self.language_backends.get(lang_code) or self.backend_order
+        return [self.backends[name] for name in order if self.backends[name].available(lang_code)]
+
+    def check_length(self, text):
+        """Raise TTSTextTooLong when `text` is over the per-request limit"""
+        if len(text or "") > self.max_chars:
+            raise TTSTextTooLong(len(text), self.max_chars)
+
+    def split_text(self, text):
+        """Sentence-aligned chunks of at most TTS_CHUNK_CHARS (overlong sentences split at spaces)"""
+        chunks = []
+        current = ""
+        for sentence in SENTENCE_END.split(" ".join((text or "").split())):
+            pieces = [sentence]
+            if len(sentence) > self.chunk_chars:
+                pieces, piece = [], ""
+                for word in sentence.split(" "):
+                    if piece and len(piece) + 1 + len(word) > self.chunk_chars:
+                        pieces.append(piece)
+                        piece = word
+                    else:
+                        piece = f"{piece} {word}" if piece else word
+                pieces.append(piece)
+            for piece in pieces:
+                if current and len(current) + 1 + len(piece) > self.chunk_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def text_to_speech(self, text, language="English", profile="original"):
+        """Convert text to speech; returns the audio cache key (None on failure)"""
+        self.check_length(text)
+        key = self._speak(text, language)
+        if key is None or profile == "original" or not self.transcoder.available:
+            return key
+        pkey = profile_key(key, profile)
+        if self.cache.get(pkey) is None:
+            try:
+                path, _ = self.cache.get(key)
+                data = self.transcoder.transcode(_read_file(path), profile)
+                self.cache.put(pkey, data, AUDIO_PROFILES[profile]["mime_type"])
+            except Exception as e:
+                print(f"TTS transcode to {profile} failed, serving the original: {e}")
+                return key
+        return pkey
+
+    def cached_audio(self, text, lang_code):
+        """(key, path, mime type) of `text` already synthesized by any eligible backend, or None"""
+        for backend in self.backends_for(lang_code):
+            key = audio_key(text, lang_code, backend.voice)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return (key, *cached)
+        return None
+
+    def _speak(self, text, language):
+        lang_code = self.lang_codes.get(language, "en")
+        cached = self.cached_audio(text, lang_code)
+        if cached is not None:
+            return cached[0]
+        chunks = self.split_text(text)
+        if not chunks:
+            return None
+
+        for backend in self.backends_for(lang_code):
+            if not self.breakers[backend.name].allow():
+                continue
+            try:
+                parts = [self._synthesize(backend, chunk, lang_code) for chunk in chunks]
+                key = audio_key(text, lang_code, backend.voice)
+                self.cache.put(key, backend.join(parts), backend.mime_type)
+                return key
+            except Exception as e:
+                print(f"TTS Error ({backend.name}): {e}")
+        return None
+
+    def _synthesize(self, backend, text, lang_code):
+        """One chunk on one backend, with the outcome recorded on its breaker"""
+        start = time.perf_counter()
+        try:
+            data = backend.synthesize(text, lang_code)
+        except Exception:
+            self.breakers[backend.name].record(False, time.perf_counter() - start)
+            raise
+        self.breakers[backend.name].record(True, time.perf_counter() - start)
+        return data
+
+    async def text_to_speech_async(self, text, language="English", profile="original"):
+        """Async version of text to speech (returns the audio cache key)"""
+        self.check_length(text)
+        lang_code = self.lang_codes.get(language, "en")
+        # Cache hits (the common case) only need the key, not the audio bytes
+        cached = self.cached_audio(text, lang_code)
+        key = cached[0] if cached is not None else None
         try:
-            # Limit text length for faster processing
-            if len(text) > 500:
-                text = text[:500] + "..."
-            
-            lang_code = self.lang_codes.get(language, "en")
-            tts = gTTS(text=text, lang=lang_code, slow=False)
-            
-            # Save to bytes
-            fp = io.BytesIO()
-            tts.write_to_fp(fp)
-            fp.seek(0)
-            
-            # Convert to base64
-            audio_base64 = base64.b64encode(fp.read()).decode()
-            return f"data:audio/mp3;base64,{audio_base64}"
+            if key is None:
+                async for key, _, _ in self._synthesize_stream(text, lang_code):
+                    pass
+        except TTSOverloaded:
+            raise
         except Exception as e:
             print(f"TTS Error: {e}")
             return None
-    
-    async def text_to_speech_async(self, text, language="English"):
-        """Async version of text to speech"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            self.executor, 
-            self.text_to_speech, 
-            text, 
-            language
-        )
+        if key is None or profile == "original":
+            return key
+        return await self.transcode_async(key, profile)
+
+    async def transcode_async(self, key, profile):
+        """Cache key of `key` re-encoded into `profile`; the original key if that is not possible.
+
+        Transcoding is CPU work, so it runs on (and is admitted by) the TTS executor.
+        """
+        if not self.transcoder.available:
+            return key
+        pkey = profile_key(key, profile)
+        if self.cache.get(pkey) is not None:
+            return pkey
+        loop = asyncio.get_running_loop()
+        try:
+            path, _ = self.cache.get(key)
+            data = await loop.run_in_executor(None, _read_file, path)
+            encoded = await self.executor.submit(self.transcoder.transcode, data, profile)
+            await loop.run_in_executor(
+                None, self.cache.put, pkey, encoded, AUDIO_PROFILES[profile]["mime_type"]
+            )
+        except TTSOverloaded:
+            raise
+        except Exception as e:
+            print(f"TTS transcode to {profile} failed, serving the original: {e}")
+            return key
+        return pkey
+
+    async def stream_speech(self, text, language="English"):
+        """Yield (key, mime type, bytes) in order as sentence chunks finish synthesizing.
+
+        All chunks are submitted to the executor at once, so the first one
+        plays while the rest are still being synthesized. Backends are tried
+        in preference order until one produces the first chunk; a failure
+        after that ends the stream. The complete audio is cached under the
+        full text's key; cached texts stream from disk. Raises TTSOverloaded
+        (queue full) or TTSTextTooLong before yielding anything.
+        """
+        self.check_length(text)
+        lang_code = self.lang_codes.get(language, "en")
+        cached = self.cached_audio(text, lang_code)
+        if cached is not None:
+            key, path, mime_type = cached
+            yield key, mime_type, await asyncio.get_running_loop().run_in_executor(None, _read_file, path)
+            return
+        async for item in self._synthesize_stream(text, lang_code):
+            yield item
+
+    async def _synthesize_stream(self, text, lang_code):
+        """Cache-miss half of stream_speech: parallel chunk synthesis, then cache the whole"""
+        loop = asyncio.get_running_loop()
+        chunks = self.split_text(text)
+        if not chunks:
+            return
+        error = RuntimeError(f"No TTS backend available for '{lang_code}'")
+        for backend in self.backends_for(lang_code):
+            if not self.breakers[backend.name].allow():
+                continue
+            key = audio_key(text, lang_code, backend.voice)
+            self.executor.admit(len(chunks))
+            futures = [self.executor.run(self._synthesize, backend, chunk, lang_code) for chunk in chunks]
+            parts = []
+            try:
+                for future in futures:
+                    parts.append(await future)
+                    yield key, backend.mime_type, backend.stream_part(parts[-1], len(parts) == 1)
+            except Exception as e:
+                if parts:
+                    raise
+                print(f"TTS backend {backend.name} failed, trying the next one: {e}")
+                error = e
+                continue
+            finally:
+                # Client went away or a chunk failed: drop chunks that have not started
+                for future in futures:
+                    future.cancel()
+            await loop.run_in_executor(None, self.cache.put, key, backend.join(parts), backend.mime_type)
+            return
+        raise error
+
+    def stats(self):
+        return {
+            name: {
+                **backend.stats(),
+                "languages": [code for code in self.lang_codes.values() if backend.available(code)],
+                "breaker": self.breakers[name].stats(),
+            }
+            for name, backend in self.backends.items()
+        }
+
+    def profiles(self):
+        """Output profiles that can be served right now"""
+        if not self.transcoder.available:
+            return ["original"]
+        return list(AUDIO_PROFILES)
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
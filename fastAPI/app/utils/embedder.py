@@ -0,0 +1,37 @@
+# embedder.py
+import os
+import threading
+
+# Same model the Node backend uses (Xenova/all-MiniLM-L6-v2), so vectors are comparable
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID", "all-MiniLM-L6-v2")
+
+_model = None
+_lock = threading.Lock()
+
+
+def get_embedding_model():
+    """Load the sentence embedding model once per process"""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL_ID)
+    return _model
+
+
+def embed_texts(texts):
+    """Return L2-normalized float32 embeddings, one row per text"""
+    model = get_embedding_model()
+    return model.encode(
+        list(texts),
+        batch_size=32,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    ).astype("float32")
+
+
+def embed_text(text):
+    """Return the normalized embedding for a single text"""
+    return embed_texts([text])[0]
@@ -4,15 +4,14 @@ from fastapi import UploadFile
 from fastapi.responses import FileResponse
 from PIL import Image
 import pdfplumber
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+from app.utils.embedder import get_embedding_model
 from ocr_utils import ocr_image
 
 # Upload directory
 UPLOAD_DIR = "uploaded_docs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Load embedding model once
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
 # Your keyword dictionary (as before)
 document_keywords = {
@@ -57,6 +56,8 @@ def classify_document(text: str) -> str:
             return doc_type
 
     # Step 2: embedding similarity
+    # Shared, lazily loaded instance (same all-MiniLM-L6-v2 model as the embedder)
+    model = get_embedding_model()
     doc_emb = model.encode(text, convert_to_tensor=True)
     similarities = {}
     for doc_type, keywords in document_keywords.items():
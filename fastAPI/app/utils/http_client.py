@@ -0,0 +1,28 @@
+# http_client.py
+import os
+import httpx
+
+# One pooled keep-alive client per process, shared by all outbound async calls
+_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(float(os.getenv("HTTP_CLIENT_TIMEOUT", 10))),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100)),
+                max_keepalive_connections=int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", 20)),
+                keepalive_expiry=30,
+            ),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,133 @@
+# model_loader.py
+import os
+import json
+import struct
+
+import torch
+
+# Local safetensors snapshots whose pages are mmap'd (and so shared by every worker on the host)
+MODEL_MMAP_DIR = os.getenv("MODEL_MMAP_DIR", "models/mmap")
+
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def mmap_enabled():
+    return os.getenv("MODEL_MMAP", "true").lower() == "true"
+
+
+def snapshot_path(model_id, dtype):
+    name = model_id.replace("/", "--")
+    return os.path.join(MODEL_MMAP_DIR, f"{name}-{str(dtype).replace('torch.', '')}.safetensors")
+
+
+def export_safetensors(model, path):
+    """Write the model's state dict once; shared (tied) tensors are stored once"""
+    from safetensors.torch import save_file
+
+    # Non-persistent buffers (e.g. sinusoidal position tables) are not in the
+    # state dict but would otherwise stay on the meta device after loading
+    state = dict(model.state_dict())
+    for name, buffer in model.named_buffers():
+        state.setdefault(name, buffer)
+
+    seen = set()
+    tensors = {}
+    for name, tensor in state.items():
+        key = (tensor.data_ptr(), tensor.dtype, tuple(tensor.shape))
+        if tensor.device.type == "meta" or key in seen:
+            continue
+        seen.add(key)
+        tensors[name] = tensor.detach().to("cpu").contiguous()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    save_file(tensors, tmp)
+    os.replace(tmp, path)
+
+
+def mmap_safetensors(path):
+    """State dict whose tensors are views of one read-only private mapping of `path`.
+
+    Pages come straight from the OS page cache, so every process mapping the
+    same file shares one physical copy until (and unless) it writes to it.
+    """
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+    base = 8 + header_len
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        start, _ = info["data_offsets"]
+        itemsize = torch.empty(0, dtype=dtype).element_size()
+        if (base + start) % itemsize:
+            raise ValueError(f"{name} is not aligned in {path}")
+        tensor = torch.empty(0, dtype=dtype)
+        tensor.set_(storage, (base + start) // itemsize, info["shape"])
+        tensors[name] = tensor
+    return tensors
+
+
+def load_seq2seq(model_id, torch_dtype=torch.float32, **kwargs):
+    """AutoModelForSeq2SeqLM with weights mmap'd from a local safetensors snapshot.
+
+    The first load exports the snapshot; afterwards the model skeleton is built
+    on the meta device and its parameters are assigned directly to mmap'd
+    tensors, so loading is near-instant and workers share the weights. Falls
+    back to a regular `from_pretrained` (MODEL_MMAP=false, or on any failure).
+    """
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+
+    kwargs.setdefault("trust_remote_code", True)
+
+    def regular():
+        return AutoModelForSeq2SeqLM.from_pretrained(
+            model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True, **kwargs
+        )
+
+    if not mmap_enabled():
+        return regular()
+
+    path = snapshot_path(model_id, torch_dtype)
+    try:
+        if not os.path.exists(path):
+            model = regular()
+            export_safetensors(model, path)
+            print(f"✅ Exported mmap snapshot: {path}")
+            del model
+
+        config = AutoConfig.from_pretrained(model_id, **kwargs)
+        with torch.device("meta"):
+            model = AutoModelForSeq2SeqLM.from_config(config, torch_dtype=torch_dtype, **kwargs)
+        tensors = mmap_safetensors(path)
+        result = model.load_state_dict(tensors, strict=False, assign=True)
+        for name in result.unexpected_keys:
+            module_name, _, attr = name.rpartition(".")
+            module = model.get_submodule(module_name)
+            if attr in module._buffers:
+                module._buffers[attr] = tensors[name]
+        model.tie_weights()
+
+        missing = [n for n, t in list(model.named_parameters()) + list(model.named_buffers()) if t.is_meta]
+        if missing:
+            raise ValueError(f"{len(missing)} tensors not in snapshot, e.g. {missing[:3]}")
+        print(f"✅ Loaded {model_id} from mmap snapshot")
+        return model
+    except Exception as e:
+        print(f"❌ mmap load failed for {model_id}, loading normally: {e}")
+        return regular()
@@ -0,0 +1,50 @@
+# sqlite_db.py
+import os
+import sqlite3
+import threading
+
+
+class SQLiteDatabase:
+    """Per-thread SQLite connections to one file, safe across pre-fork workers.
+
+    Every thread gets its own connection, so readers never queue behind a
+    Python lock; WAL mode lets them run alongside a writer, and SQLite
+    serializes writers itself (waiting up to `timeout`). A connection is
+    reopened when the pid changes, because connections must not cross a fork.
+    `schema` statements run once per new connection.
+    """
+
+    def __init__(self, path, schema=(), pragmas=("journal_mode=WAL",), timeout=5):
+        self.path = path
+        self.schema = tuple(schema)
+        self.pragmas = tuple(pragmas)
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+
+    def connection(self):
+        """This thread's connection, opened on first use in this process"""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+            for statement in self.schema:
+                conn.execute(statement)
+            conn.commit()
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def write(self, sql, params=()):
+        """Execute one statement and commit"""
+        conn = self.connection()
+        with conn:
+            conn.execute(sql, params)
+
+    def write_many(self, sql, rows):
+        conn = self.connection()
+        with conn:
+            conn.executemany(sql, rows)
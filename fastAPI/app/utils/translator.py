@@ -1,121 +1,369 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
 import torch
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from transformers import AutoTokenizer
 from IndicTransToolkit.processor import IndicProcessor
+from app.services.translation_cache import get_translation_cache
+from app.services.language_detector import get_language_detector
+from app.utils.model_loader import load_seq2seq
+
+try:
+    from indicnlp.tokenize.sentence_tokenize import sentence_split
+except ImportError:
+    sentence_split = None
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-MODEL_ID = "ai4bharat/indictrans2-indic-en-dist-200M"
 
-tokenizer = AutoTokenizer.from_pretrained(MODEL_ID, trust_remote_code=True)
-model = AutoModelForSeq2SeqLM.from_pretrained(
-    MODEL_ID, trust_remote_code=True, torch_dtype="auto"
-).to(DEVICE).eval()
+# IndicTrans2 checkpoints by translation direction
+MODEL_IDS = {
+    "indic-en": "ai4bharat/indictrans2-indic-en-dist-200M",
+    "en-indic": "ai4bharat/indictrans2-en-indic-dist-200M",
+    "indic-indic": "ai4bharat/indictrans2-indic-indic-dist-320M",
+}
+MODEL_ID = MODEL_IDS["indic-en"]
 
-ip = IndicProcessor(inference=True)
-def translate_text(text: str, language: str = "hi", max_len: int = 256) -> str:
-    try:
-        # Map frontend language codes to IndicTrans codes
-        lang_map = {
-            "hi": "hin_Deva",
-            "bn": "ben_Beng", 
-            "or": "ory_Orya",
-            "kn": "kan_Knda"
-        }
-        
-        src_lang = lang_map.get(language, "hin_Deva")
-        tgt_lang = "eng_Latn"
-
-        # 1. Preprocess
-        batch = ip.preprocess_batch([text], src_lang=src_lang, tgt_lang=tgt_lang)
-        print("Preprocessed batch:", batch)
-        if not batch or not batch[0].strip():
-            raise ValueError("Preprocessor returned empty input.")
-
-        # 2. Tokenize
+# Inference backend: "torch" (full precision) or "int8" (dynamic quantization, CPU)
+BACKEND = os.getenv("TRANSLATION_BACKEND", "torch").lower()
+
+
+class TorchBackend:
+    """HF `generate` on the PyTorch model, optionally int8 dynamically quantized"""
+
+    def __init__(self, model_id=MODEL_ID, quantize=False):
+        self.name = "int8" if quantize else "torch"
+        self.model_id = model_id
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id, trust_remote_code=True)
+        # Weights are mmap'd from a local safetensors snapshot, shared by all workers
+        model = load_seq2seq(model_id, torch_dtype=torch.float32)
+        parameters = sum(p.numel() for p in model.parameters())
+        self.size_mb = parameters * (1 if quantize else 4) / 2**20
+        if quantize:
+            # Linear layers dominate the 200M parameters; int8 weights, fp32 activations
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.device = "cpu"
+        else:
+            self.device = DEVICE
+        self.model = model.to(self.device).eval()
+
+    def generate(self, batch, tgt_lang, max_len, num_beams=4):
+        tokenizer, model = self.tokenizer, self.model
+
+        # Tokenize (padded to the longest text in the batch) and move to the model device
         enc = tokenizer(
             batch,
             truncation=True,
             padding="longest",
             return_tensors="pt"
         )
+        enc = {k: v.to(self.device) for k, v in enc.items() if v is not None}
 
-        # Debug: print keys and shapes/types
-        for k, v in enc.items():
-            print(f"enc key: {k} type: {type(v)}", end="")
-            if hasattr(v, "shape"):
-                print(f" shape: {v.shape} device: {v.device}")
-            else:
-                print(" (no shape)")
-
-        # 3. Move tensors explicitly to model device
-        enc = {k: v.to(DEVICE) for k, v in enc.items() if v is not None}
-        print("input device:", enc['input_ids'].device, "model device:", next(model.parameters()).device)
-
-        # 4. Token ids and config debug
-        print("tokenizer.pad_token_id:", tokenizer.pad_token_id)
-        print("tokenizer.eos_token_id:", tokenizer.eos_token_id)
-        print("model.config.is_encoder_decoder:", getattr(model.config, "is_encoder_decoder", None))
-        print("model.config.decoder_start_token_id:", getattr(model.config, "decoder_start_token_id", None))
-
-        # 5. Try to find a reasonable decoder_start_token_id for target language
-        # Many IndicTrans variants include language tokens like '<2eng_Latn>' in vocab.
-        cand = "<2eng_Latn>"
-        cand_id = tokenizer.convert_tokens_to_ids(cand)
-        print(f"convert_tokens_to_ids('{cand}') ->", cand_id)
-        decoder_start_id = model.config.decoder_start_token_id or (cand_id if cand_id != tokenizer.unk_token_id else None)
-        print("using decoder_start_token_id:", decoder_start_id)
-
-        # 6. Safeguard pad/eos token ids
+        # Safeguard pad/eos token ids
         pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
         eos_id = tokenizer.eos_token_id if tokenizer.eos_token_id is not None else pad_id
         if pad_id is None or eos_id is None:
             raise ValueError("tokenizer.pad_token_id and tokenizer.eos_token_id are both None")
 
-        # 7. Try generate with two fallbacks:
-        # First try standard call; if it fails, try with return_dict_in_generate & use_cache=False & explicit decoder_start_token_id
+        # Generate; if the standard call fails, retry without the cache and with an
+        # explicit decoder_start_token_id (IndicTrans vocabularies include '<2eng_Latn>')
         try:
             with torch.no_grad():
                 outputs = model.generate(
                     input_ids=enc["input_ids"],
                     attention_mask=enc.get("attention_mask", None),
                     max_length=max_len,
-                    num_beams=4,
+                    num_beams=num_beams,
                     pad_token_id=pad_id,
                     eos_token_id=eos_id,
                 )
         except Exception as e1:
             print("generate failed first attempt:", e1)
-            # second attempt with explicit decoder_start_token_id and disabling use_cache
             gen_kwargs = dict(
                 input_ids=enc["input_ids"],
                 attention_mask=enc.get("attention_mask", None),
                 max_length=max_len,
-                num_beams=4,
+                num_beams=num_beams,
                 pad_token_id=pad_id,
                 eos_token_id=eos_id,
                 use_cache=False,
                 return_dict_in_generate=True,
             )
+            cand_id = tokenizer.convert_tokens_to_ids(f"<2{tgt_lang}>")
+            decoder_start_id = model.config.decoder_start_token_id or (
+                cand_id if cand_id != tokenizer.unk_token_id else None
+            )
             if decoder_start_id is not None:
                 gen_kwargs["decoder_start_token_id"] = int(decoder_start_id)
-            print("generate retry kwargs:", {k: (v if k!="input_ids" else f"tensor(shape={enc['input_ids'].shape})") for k,v in gen_kwargs.items()})
             with torch.no_grad():
                 outobj = model.generate(**gen_kwargs)
-                # outobj may be a GenerationOutput when return_dict_in_generate=True
-                # If so, get sequences
                 outputs = outobj.sequences if hasattr(outobj, "sequences") else outobj
 
-        # 8. Final debug on outputs
-        print("outputs type:", type(outputs))
-        if hasattr(outputs, "shape"):
-            print("outputs shape:", outputs.shape)
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
 
-        # 9. Decode & postprocess
-        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
-        out = ip.postprocess_batch(decoded, lang=tgt_lang)
-        print("Decoded output:", decoded)
-        return out[0] if out else ""
 
+def load_backend(name=BACKEND, direction="indic-en"):
+    """Inference backend by TRANSLATION_BACKEND name for one direction"""
+    model_id = MODEL_IDS[direction]
+    if name == "torch":
+        return TorchBackend(model_id)
+    if name == "int8":
+        return TorchBackend(model_id, quantize=True)
+    raise ValueError(f"Unknown TRANSLATION_BACKEND: {name}")
+
+
+class ModelRegistry:
+    """Lazily loaded translation backends by direction, capped by a memory budget.
+
+    A direction's model is loaded the first time it is requested. When the
+    resident models exceed `memory_budget_mb`, the least recently used ones
+    (never the one just requested) are dropped. A failed load is not retried
+    for `retry_seconds`, so callers can fall back quickly.
+    """
+
+    def __init__(self, loader=load_backend, memory_budget_mb=None, retry_seconds=300):
+        self.loader = loader
+        self.memory_budget_mb = float(
+            memory_budget_mb if memory_budget_mb is not None else os.getenv("TRANSLATION_MODEL_MEMORY_MB", 2048)
+        )
+        self.retry_seconds = retry_seconds
+        self._models = OrderedDict()  # direction -> backend
+        self._failed = {}  # direction -> monotonic time of the failed load
+        self._lock = threading.Lock()
+        self._load_locks = {direction: threading.Lock() for direction in MODEL_IDS}
+
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, direction):
+        with self._lock:
+            model = self._models.get(direction)
+            if model is not None:
+                self._models.move_to_end(direction)
+                return model
+
+        with self._load_locks[direction]:
+            with self._lock:
+                model = self._models.get(direction)
+                if model is not None:
+                    return model
+                failed_at = self._failed.get(direction)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+                raise RuntimeError(f"{direction} translation model unavailable")
+
+            try:
+                model = self.loader(BACKEND, direction)
+            except Exception:
+                with self._lock:
+                    self._failed[direction] = time.monotonic()
+                raise
+            print(f"✅ IndicTrans {direction} model loaded ({model.name}, ~{model.size_mb:.0f} MB)")
+
+            with self._lock:
+                self._failed.pop(direction, None)
+                self._models[direction] = model
+                self.loads += 1
+                while len(self._models) > 1 and self._resident_mb() > self.memory_budget_mb:
+                    evicted, _ = self._models.popitem(last=False)
+                    self.evictions += 1
+                    print(f"IndicTrans {evicted} model evicted (memory budget {self.memory_budget_mb:.0f} MB)")
+            return model
+
+    def available(self, direction):
+        """False while a recent load of this direction failed"""
+        failed_at = self._failed.get(direction)
+        return failed_at is None or time.monotonic() - failed_at >= self.retry_seconds
+
+    def _resident_mb(self):
+        return sum(model.size_mb for model in self._models.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "resident": {d: round(m.size_mb, 1) for d, m in self._models.items()},
+                "resident_mb": round(self._resident_mb(), 1),
+                "memory_budget_mb": self.memory_budget_mb,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "unavailable": [d for d in self._failed if not self.available(d)],
+            }
+
+
+registry = ModelRegistry()
+
+
+def preload_models(directions=None):
+    """Load the busiest directions up front (before any pre-fork, so workers share them)"""
+    if directions is None:
+        directions = os.getenv("TRANSLATION_PRELOAD_DIRECTIONS", "indic-en")
+    for direction in directions.split(","):
+        if direction.strip():
+            try:
+                registry.get(direction.strip())
+            except Exception as e:
+                print(f"❌ IndicTrans {direction.strip()} model failed to load: {e}")
+
+ip = IndicProcessor(inference=True)
+
+# Map frontend language codes to IndicTrans codes
+LANG_MAP = {
+    "hi": "hin_Deva",
+    "bn": "ben_Beng",
+    "or": "ory_Orya",
+    "kn": "kan_Knda"
+}
+# Language names as used by the chat/form endpoints
+LANGUAGE_NAMES = {
+    "English": "eng_Latn",
+    "Hindi": "hin_Deva",
+    "Bengali": "ben_Beng",
+    "Odia": "ory_Orya",
+    "Kannada": "kan_Knda",
+}
+TGT_LANG = "eng_Latn"
+ISO_CODES = {code: iso for iso, code in LANG_MAP.items()}
+ISO_CODES[TGT_LANG] = "en"
+
+# Sentences end at danda/double danda or Latin terminal punctuation
+SENTENCE_END = re.compile(r"(?<=[।॥.?!])\s+")
+
+# Sentences per generate call once long inputs have been split and length-sorted
+SEGMENT_BATCH_SIZE = int(os.getenv("TRANSLATION_SEGMENT_BATCH_SIZE", 32))
+
+# Decoding profiles: greedy with a tight length cap for UI strings, beams for prose
+DECODING_PROFILES = {
+    "fast": {"num_beams": 1, "max_len": 96},
+    "balanced": {"num_beams": 2, "max_len": 192},
+    "quality": {"num_beams": 4, "max_len": 256},
+}
+PROFILE_SHORT_CHARS = int(os.getenv("TRANSLATION_PROFILE_SHORT_CHARS", 40))
+PROFILE_LONG_CHARS = int(os.getenv("TRANSLATION_PROFILE_LONG_CHARS", 600))
+PROFILE_BUSY_QUEUE = int(os.getenv("TRANSLATION_PROFILE_BUSY_QUEUE", 32))
+
+
+def resolve_lang(language: str, text: str = None) -> str:
+    """IndicTrans source language code for a frontend language code.
+
+    "auto" (or an empty/unknown code) detects the language from `text` when
+    it is given; without text the old hin_Deva default applies. Romanized
+    Hindi raises ValueError: IndicTrans reads hin_Deva as Devanagari, so
+    callers must send Latin-script Hindi elsewhere (see TranslationService).
+    """
+    code = LANG_MAP.get(language) or LANGUAGE_NAMES.get(language)
+    if code:
+        return code
+    if text:
+        code = get_language_detector().detect_code(text)
+        if code is None:
+            raise ValueError("Romanized Hindi is not supported by IndicTrans")
+        return code
+    return "hin_Deva"
+
+
+def lang_code(language: str):
+    """IndicTrans code for a language name or frontend code, or None if unsupported"""
+    return LANGUAGE_NAMES.get(language) or LANG_MAP.get(language)
+
+
+def direction_for(src_lang: str, tgt_lang: str) -> str:
+    if tgt_lang == TGT_LANG:
+        return "indic-en"
+    if src_lang == TGT_LANG:
+        return "en-indic"
+    return "indic-indic"
+
+
+def split_sentences(text: str, src_lang: str):
+    """Sentences of one line of text (Indic NLP splitter when installed, else regex)"""
+    text = text.strip()
+    if not text:
+        return []
+    if sentence_split is not None and src_lang in ISO_CODES:
+        try:
+            return [s.strip() for s in sentence_split(text, lang=ISO_CODES[src_lang]) if s.strip()]
+        except Exception as e:
+            print(f"Sentence split failed, using regex: {e}")
+    return [s.strip() for s in SENTENCE_END.split(text) if s.strip()]
+
+
+def choose_profile(text: str, queue_depth: int = 0) -> str:
+    """Adaptive decoding profile: greedy for short strings or under load, beams otherwise"""
+    length = len(text or "")
+    if length <= PROFILE_SHORT_CHARS or queue_depth >= PROFILE_BUSY_QUEUE:
+        return "fast"
+    if length <= PROFILE_LONG_CHARS and queue_depth < PROFILE_BUSY_QUEUE // 2:
+        return "quality"
+    return "balanced"
+
+
+def translate_batch(texts, src_lang: str, profile: str = "quality", tgt_lang: str = TGT_LANG, max_len: int = None):
+    """Translate many texts of one source language, sentence by sentence.
+
+    Each text is split into lines and sentences so nothing is lost to
+    truncation and beam search stays on short sequences. All sentences are
+    sorted by length and translated in padded batches (cached sentences are
+    skipped), then reassembled in order (line breaks preserved). The model
+    for the (src_lang, tgt_lang) direction comes from the registry; `profile`
+    names an entry of DECODING_PROFILES. Texts already in the target
+    language are returned as-is. Raises on failure; callers decide how to
+    degrade.
+    """
+    if src_lang == tgt_lang:
+        return [text or "" for text in texts]
+    settings = DECODING_PROFILES[profile]
+    max_len = max_len or settings["max_len"]
+
+    sentences = []
+    layouts = []  # per text: per line, the indices of its sentences
+    for text in texts:
+        layout = []
+        for line in (text or "").split("\n"):
+            indices = []
+            for sentence in split_sentences(line, src_lang):
+                indices.append(len(sentences))
+                sentences.append(sentence)
+            layout.append(indices)
+        layouts.append(layout)
+
+    # Repeated boilerplate sentences are served from the cache and never reach the model
+    cache = get_translation_cache()
+    direction = direction_for(src_lang, tgt_lang)
+    model_key = f"{MODEL_IDS[direction]}:{BACKEND}:{profile}"
+    translated = cache.get_many(sentences, src_lang, tgt_lang, model_key)
+    todo = list({sentences[i]: None for i, text in enumerate(translated) if text is None})
+
+    todo.sort(key=len)
+    done = {}
+    for start in range(0, len(todo), SEGMENT_BATCH_SIZE):
+        chunk = todo[start:start + SEGMENT_BATCH_SIZE]
+        out = _generate(chunk, src_lang, tgt_lang, max_len, settings["num_beams"], registry.get(direction))
+        cache.put_many(chunk, out, src_lang, tgt_lang, model_key)
+        done.update(zip(chunk, out))
+    translated = [text if text is not None else done.get(sentences[i], "") for i, text in enumerate(translated)]
+
+    return [
+        "\n".join(" ".join(translated[i] for i in indices) for indices in layout)
+        for layout in layouts
+    ]
+
+
+def _generate(texts, src_lang, tgt_lang, max_len, num_beams, model):
+    """One padded generate call over already-segmented texts"""
+    # 1. Preprocess
+    batch = ip.preprocess_batch(list(texts), src_lang=src_lang, tgt_lang=tgt_lang)
+    if not batch or len(batch) != len(texts):
+        raise ValueError("Preprocessor returned empty input.")
+
+    # 2. Generate with the direction's backend, then postprocess
+    decoded = model.generate(batch, tgt_lang, max_len, num_beams)
+    return ip.postprocess_batch(decoded, lang=tgt_lang)
+
+
+def translate_text(text: str, language: str = "hi", max_len: int = 256, profile: str = "quality") -> str:
+    try:
+        out = translate_batch([text], resolve_lang(language, text), profile, max_len=max_len)
+        return out[0] if out else ""
     except Exception as e:
         print(f"Translation error: {e}")
         return text
-        
\ No newline at end of file
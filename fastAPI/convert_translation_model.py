@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Validate and compare IndicTrans inference backends (TRANSLATION_BACKEND).
+
+    # Smoke-check one backend
+    python convert_translation_model.py validate --backend int8 --direction indic-en
+
+    # Latency / memory / agreement with the full-precision model
+    python convert_translation_model.py compare --backends torch,int8 --samples samples.txt
+
+int8 needs no conversion: the PyTorch model is dynamically quantized at load time.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Reference backend for the translator module; others are loaded explicitly below
+os.environ.setdefault("TRANSLATION_BACKEND", "torch")
+
+SAMPLES = [
+    "प्रधानमंत्री किसान सम्मान निधि योजना के तहत किसानों को हर साल छह हजार रुपये मिलते हैं।",
+    "आवेदन करने के लिए आधार कार्ड और बैंक खाते की जानकारी आवश्यक है।",
+    "आयुष्मान भारत योजना गरीब परिवारों को पांच लाख रुपये तक का स्वास्थ्य बीमा देती है।",
+    "अपने नजदीकी जन सेवा केंद्र पर जाएं।",
+    "नाम",
+    "जमा करें",
+    "क्या मैं इस योजना के लिए पात्र हूं?",
+    "आवेदन की स्थिति जांचने के लिए अपना आवेदन क्रमांक दर्ज करें।",
+]
+EN_SAMPLES = [
+    "Farmers receive six thousand rupees every year under this scheme.",
+    "Aadhaar card and bank account details are required to apply.",
+    "Visit your nearest Common Service Centre.",
+    "Submit",
+]
+
+# direction -> (samples, src_lang, tgt_lang) used by validate
+VALIDATION = {
+    "indic-en": (SAMPLES, "hin_Deva", "eng_Latn"),
+    "en-indic": (EN_SAMPLES, "eng_Latn", "hin_Deva"),
+    "indic-indic": (SAMPLES, "hin_Deva", "ben_Beng"),
+}
+
+
+def rss_mb():
+    """Resident set size of this process (Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def similarity(hypothesis, reference):
+    """chrF when sacrebleu is installed, else word-overlap F1 (0-100)"""
+    try:
+        import sacrebleu
+        return sacrebleu.sentence_chrf(hypothesis, [reference]).score
+    except ImportError:
+        hyp, ref = hypothesis.lower().split(), reference.lower().split()
+        if not hyp or not ref:
+            return 100.0 if hyp == ref else 0.0
+        common = sum(min(hyp.count(w), ref.count(w)) for w in set(hyp))
+        if not common:
+            return 0.0
+        precision, recall = common / len(hyp), common / len(ref)
+        return 100 * 2 * precision * recall / (precision + recall)
+
+
+def run_backend(translator, backend, texts, src_lang, runs, tgt_lang="eng_Latn"):
+    """Translate `texts` `runs` times with `backend` (quality profile, no cache); return (outputs, per-run seconds)"""
+    settings = translator.DECODING_PROFILES["quality"]
+    timings = []
+    outputs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        outputs = translator._generate(
+            texts, src_lang, tgt_lang, settings["max_len"], settings["num_beams"], backend
+        )
+        timings.append(time.perf_counter() - start)
+    return outputs, timings
+
+
+def validate(args):
+    from app.utils import translator
+
+    samples, src_lang, tgt_lang = VALIDATION[args.direction]
+    backend = translator.load_backend(args.backend, args.direction)
+    outputs, timings = run_backend(translator, backend, samples[:4], src_lang, 1, tgt_lang)
+    for source, output in zip(samples, outputs):
+        print(f"  {source}\n  -> {output}")
+    empty = sum(1 for o in outputs if not o.strip())
+    if empty:
+        print(f"❌ {empty} empty translations from {args.backend}")
+        return 1
+    print(f"✅ {args.backend} OK ({timings[0] * 1000:.0f} ms for {len(outputs)} sentences)")
+    return 0
+
+
+def compare(args):
+    texts = SAMPLES
+    if args.samples:
+        with open(args.samples, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    from app.utils import translator
+
+    rows = []
+    reference = None
+    for name in args.backends.split(","):
+        before = rss_mb()
+        backend = translator.load_backend(name)
+        loaded = rss_mb() - before
+        if reference is None:
+            reference, _ = run_backend(translator, backend, texts, args.src, 1)
+
+        run_backend(translator, backend, texts[:2], args.src, 1)  # warm-up
+        outputs, timings = run_backend(translator, backend, texts, args.src, args.runs)
+        single = []
+        for text in texts[:min(len(texts), 8)]:
+            _, t = run_backend(translator, backend, [text], args.src, 1)
+            single.append(t[0])
+
+        agreement = statistics.mean(similarity(o, r) for o, r in zip(outputs, reference))
+        rows.append((name, loaded, statistics.median(timings), statistics.median(single), agreement))
+
+    print(f"\n{len(texts)} sentences, {args.runs} runs, reference = {rows[0][0]}")
+    print(f"{'backend':<12} {'load RSS MB':>11} {'batch ms':>9} {'1-sent ms':>10} {'agreement':>10}")
+    for name, loaded, batch_s, single_s, agreement in rows:
+        print(f"{name:<12} {loaded:>11.0f} {batch_s * 1000:>9.0f} {single_s * 1000:>10.0f} {agreement:>10.1f}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", help="translate a few sentences with one backend")
+    p.add_argument("--backend", default="int8", choices=["torch", "int8"])
+    p.add_argument("--direction", default="indic-en", choices=["indic-en", "en-indic", "indic-indic"])
+
+    p = sub.add_parser("compare", help="latency/memory/agreement against the first backend listed")
+    p.add_argument("--backends", default="torch,int8")
+    p.add_argument("--samples", help="file with one source sentence per line")
+    p.add_argument("--src", default="hin_Deva")
+    p.add_argument("--runs", type=int, default=3)
+
+    args = parser.parse_args()
+    return {"validate": validate, "compare": compare}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+"""
+Pre-fork deployment: models are loaded once in the master and shared with workers.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+With preload_app the master imports app.main (and with it the IndicTrans
+weights, which are mmap'd from a local safetensors snapshot) before forking,
+so N workers share one physical copy of the weights through copy-on-write
+and the page cache instead of each loading its own.
+"""
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+
+
+def on_starting(server):
+    """Runs in the master after preload: load lazily created models before forking"""
+    if os.getenv("PRELOAD_EMBEDDING_MODEL", "true").lower() == "true":
+        from app.utils.embedder import get_embedding_model
+        get_embedding_model()
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of GC tracking, so collections in the
+    # workers do not write to (and un-share) the master's object pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Each worker gets its share of cores instead of every worker using all of them
+    threads = os.getenv("TORCH_THREADS_PER_WORKER")
+    if threads:
+        import torch
+        torch.set_num_threads(int(threads))
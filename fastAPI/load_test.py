@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Concurrency/latency smoke test for /chat and /chat/stream.
+
+Start the API with the offline LLM stand-in so no network or quota is used:
+
+    LLM_PROVIDER=local SCHEME_INDEX_ENABLED=false uvicorn app.main:app --port 8000
+    python load_test.py --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+QUERIES = [
+    "PM-KISAN eligibility",
+    "health insurance for BPL families",
+    "scholarship for OBC students",
+    "how to apply for Mudra loan",
+    "widow pension in West Bengal",
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def one_chat(client, url, query, stream):
+    start = time.perf_counter()
+    first_byte = None
+    if stream:
+        async with client.stream("POST", f"{url}/chat/stream", json={"message": query}) as response:
+            response.raise_for_status()
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+    else:
+        response = await client.post(f"{url}/chat", json={"message": query})
+        response.raise_for_status()
+        first_byte = time.perf_counter() - start
+    return first_byte, time.perf_counter() - start
+
+
+async def run(url, total, concurrency, stream, unique):
+    semaphore = asyncio.Semaphore(concurrency)
+    results, errors = [], 0
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        async def worker(i):
+            nonlocal errors
+            query = QUERIES[i % len(QUERIES)]
+            if unique:
+                # Defeat the response cache / coalescing to measure the full path
+                query = f"{query} #{i}"
+            async with semaphore:
+                try:
+                    results.append(await one_chat(client, url, query, stream))
+                except Exception as e:
+                    errors += 1
+                    print(f"❌ Request {i} failed: {e}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    if not results:
+        print("❌ No successful requests")
+        return
+
+    ttfb = [r[0] for r in results]
+    latency = [r[1] for r in results]
+    print("=" * 50)
+    print(f"Endpoint:      {'/chat/stream' if stream else '/chat'}")
+    print(f"Requests:      {len(results)} ok, {errors} failed, concurrency {concurrency}")
+    print(f"Throughput:    {len(results) / elapsed:.1f} req/s")
+    print(f"TTFB p50/p95:  {statistics.median(ttfb) * 1000:.1f} / {percentile(ttfb, 95) * 1000:.1f} ms")
+    print(f"Total p50/p95: {statistics.median(latency) * 1000:.1f} / {percentile(latency, 95) * 1000:.1f} ms")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--stream", action="store_true", help="Use /chat/stream and report time to first byte")
+    parser.add_argument("--unique", action="store_true", help="Make every query unique (no cache hits)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.requests, args.concurrency, args.stream, args.unique))
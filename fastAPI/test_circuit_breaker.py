@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Backend-incident check for the scheme search circuit breaker (RAGService):
+slow backend -> circuit opens -> chat fails fast to the last good result ->
+half-open probe after the open window -> closed again once the backend recovers
+"""
+import os
+import sys
+import time
+sys.path.append('.')
+
+os.environ.setdefault("LLM_PROVIDER", "local")
+os.environ["CB_BACKEND_SEARCH_WINDOW"] = "4"
+os.environ["CB_BACKEND_SEARCH_MIN_CALLS"] = "4"
+os.environ["CB_BACKEND_SEARCH_SLOW_CALL_SECONDS"] = "0.1"
+os.environ["CB_BACKEND_SEARCH_SLOW_CALL_RATE"] = "0.5"
+os.environ["CB_BACKEND_SEARCH_OPEN_SECONDS"] = "0.5"
+
+from app.services import rag_service
+from app.services.circuit_breaker import CLOSED, OPEN, HALF_OPEN
+
+BACKEND_DELAY = 0.15  # slow but under the request timeout: only the latency rate can trip the breaker
+
+
+class FakeBackend:
+    """Replaces requests.post for /api/v1/schemes/search"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return FakeResponse({"results": [{"name": f"Scheme for {json['query']}"}]})
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def test_backend_incident():
+    backend = FakeBackend()
+    rag_service.requests.post = backend.post
+    service = rag_service.RAGService()
+    breaker = service.backend_breaker
+
+    # Healthy backend: results come through and become the query's last good result
+    schemes, _ = timed(service._retrieve_schemes, "pension for farmers")
+    assert schemes == [{"name": "Scheme for pension for farmers"}], schemes
+    print("✅ healthy backend: results returned and remembered")
+
+    # Incident: every call is slow; once half the window is slow the circuit opens
+    backend.delay = BACKEND_DELAY
+    for i in range(3):
+        service._retrieve_schemes(f"other query {i}")
+    assert breaker.state == OPEN, breaker.stats()
+    opened_at = time.perf_counter()
+    print(f"✅ circuit opened after {breaker.stats()['times_opened']} trip on slow calls")
+
+    # Open: no backend call, the last good result in milliseconds instead of the backend delay
+    calls_before = backend.calls
+    schemes, elapsed = timed(service._retrieve_schemes, "Pension for farmers?")
+    assert backend.calls == calls_before, "an open circuit must not call the backend"
+    assert schemes == [{"name": "Scheme for pension for farmers"}], schemes
+    assert elapsed < 0.02, f"fail-fast took {elapsed * 1000:.1f} ms"
+    assert service._retrieve_schemes("never seen before") is None  # caller uses basic data
+    print(f"✅ open circuit: last good result in {elapsed * 1000:.2f} ms, backend not called")
+
+    # The state /health reports
+    stats = breaker.stats()
+    assert stats["state"] == OPEN and stats["rejected"] == 2 and 0 < stats["retry_in"] <= 0.5, stats
+    print(f"✅ /health view: state={stats['state']}, rejected={stats['rejected']}, retry_in={stats['retry_in']}s")
+
+    # Still inside the open window: keep failing fast
+    time.sleep(max(0.0, 0.3 - (time.perf_counter() - opened_at)))
+    assert not breaker.allow() and breaker.state == OPEN
+
+    # After the open window: exactly one half-open probe; the backend has recovered
+    backend.delay = 0.0
+    time.sleep(max(0.0, 0.55 - (time.perf_counter() - opened_at)))
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow(), "only one probe may run while half-open"
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+    schemes = service._retrieve_schemes("scholarship for girls")
+    assert schemes == [{"name": "Scheme for scholarship for girls"}] and breaker.state == CLOSED
+    print(f"✅ half-open probe after {time.perf_counter() - opened_at:.2f}s succeeded, circuit closed")
+
+
+def test_slow_probe_reopens_for_a_full_window():
+    """A slow half-open probe reopens the circuit; late results from before it opened do not extend it"""
+    backend = FakeBackend()
+    rag_service.requests.post = backend.post
+    breaker = rag_service.RAGService().backend_breaker
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(True, BACKEND_DELAY)
+    assert breaker.state == OPEN
+
+    # Calls admitted before the trip finish late: ignored while open
+    for _ in range(4):
+        breaker.record(False, BACKEND_DELAY)
+    assert breaker.stats()["times_opened"] == 1
+
+    time.sleep(0.55)
+    assert breaker.allow()
+    breaker.record(True, BACKEND_DELAY)  # probe succeeded, but slowly
+    assert breaker.state == OPEN and breaker.stats()["times_opened"] == 2
+    assert breaker.stats()["retry_in"] > 0.4
+    print("✅ slow probe reopened the circuit for a full window; late outcomes were ignored")
+
+
+if __name__ == "__main__":
+    print("Testing scheme search circuit breaker...")
+    print("=" * 50)
+    test_backend_incident()
+    test_slow_probe_reopens_for_a_full_window()
+    print("\n✅ Backend incidents cost milliseconds per chat, not the backend timeout")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Thundering-herd check for /chat: a burst of the same question, typed with
+different case and punctuation, must reach the LLM once, survive the first
+client disconnecting, and leave nothing behind once it is answered
+"""
+import sys
+import asyncio
+sys.path.append('.')
+
+from app.services.response_cache import cache_key
+from app.services.single_flight import SingleFlight
+
+BURST = ["PM Kisan eligibility?", "pm kisan eligibility", "PM-Kisan eligibility!", "  pm kisan   ELIGIBILITY  "]
+
+
+class FakeLLM:
+    """Counts upstream generations; `fail` makes the next one raise"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.prompts = []
+        self.fail = False
+
+    async def generate(self, message, language):
+        self.prompts.append(message)
+        await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("LLM quota exceeded")
+        return {"response": f"Answer ({language}) #{len(self.prompts)}"}
+
+
+def ask(flight, llm, message, language="English"):
+    """What /chat does on a cache miss"""
+    return flight.do(("chat", cache_key(message, language)), llm.generate, message, language)
+
+
+def test_burst_reaches_llm_once():
+    async def run():
+        flight, llm = SingleFlight(), FakeLLM()
+        answers = await asyncio.gather(*(ask(flight, llm, m) for m in BURST))
+        # A different language is a different answer, so it is not coalesced
+        hindi = await ask(flight, llm, BURST[0], "Hindi")
+        return flight, llm, answers, hindi
+
+    flight, llm, answers, hindi = asyncio.run(run())
+    assert llm.prompts == [BURST[0], BURST[0]], llm.prompts
+    assert all(a is answers[0] for a in answers), answers  # everyone got the one result object
+    assert hindi["response"] == "Answer (Hindi) #2"
+    assert flight.stats() == {"in_flight": 0, "calls": 2, "coalesced": 3}, flight.stats()
+    print(f"✅ {len(BURST)} spellings of one question -> 1 LLM call; Hindi asked separately")
+
+
+def test_first_client_disconnect_does_not_cancel_the_rest():
+    async def run():
+        flight, llm = SingleFlight(), FakeLLM(latency=0.1)
+        first = asyncio.ensure_future(ask(flight, llm, BURST[0]))
+        await asyncio.sleep(0)  # the first request starts the upstream call
+        rest = [asyncio.ensure_future(ask(flight, llm, m)) for m in BURST[1:]]
+        await asyncio.sleep(0.02)
+        first.cancel()  # its client went away mid-generation
+        answers = await asyncio.gather(*rest)
+        return llm, first, answers
+
+    llm, first, answers = asyncio.run(run())
+    assert first.cancelled()
+    assert len(llm.prompts) == 1 and all(a["response"] == "Answer (English) #1" for a in answers), answers
+    print("✅ first caller cancelled; the other 3 still got the single upstream answer")
+
+
+def test_not_a_cache_and_failures_are_retried():
+    async def run():
+        flight, llm = SingleFlight(), FakeLLM()
+        llm.fail = True
+        failed = await asyncio.gather(*(ask(flight, llm, m) for m in BURST), return_exceptions=True)
+        in_flight_after_failure = flight.stats()["in_flight"]
+        llm.fail = False
+        retried = await asyncio.gather(*(ask(flight, llm, m) for m in BURST))
+        again = await ask(flight, llm, BURST[0])  # answered burst is forgotten too
+        return llm, failed, in_flight_after_failure, retried, again
+
+    llm, failed, in_flight_after_failure, retried, again = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) and str(e) == "LLM quota exceeded" for e in failed), failed
+    assert in_flight_after_failure == 0
+    assert [r["response"] for r in retried] == ["Answer (English) #2"] * len(BURST), retried
+    assert again["response"] == "Answer (English) #3" and len(llm.prompts) == 3
+    print("✅ failure reached all 4 waiters; the next burst retried; finished calls are not cached")
+
+
+if __name__ == "__main__":
+    print("Testing /chat request coalescing...")
+    print("=" * 50)
+    test_burst_reaches_llm_once()
+    test_first_client_disconnect_does_not_cancel_the_rest()
+    test_not_a_cache_and_failures_are_retried()
+    print("\n✅ Duplicate in-flight chat questions share one LLM call")
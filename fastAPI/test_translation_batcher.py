@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Micro-batching check for translation: mixed concurrent traffic is grouped by
+source language and length bucket, full queues flush at once, partial ones
+after the wait window, and the model runs off the event loop
+"""
+import sys
+import time
+import asyncio
+sys.path.append('.')
+
+from app.services.translation_batcher import TranslationBatcher
+
+MODEL_SECONDS = 0.1  # per batch, whatever its size: batching is what makes the model cheaper
+
+
+class FakeModel:
+    """Batch translate function that blocks its thread like model.generate"""
+
+    def __init__(self, fail_lang=None):
+        self.batches = []
+        self.fail_lang = fail_lang
+
+    def translate_batch(self, texts, src_lang, profile):
+        self.batches.append((src_lang, len(texts)))
+        time.sleep(MODEL_SECONDS)
+        if src_lang == self.fail_lang:
+            raise RuntimeError(f"{src_lang} model crashed")
+        return [f"en({t})" for t in texts]
+
+
+def make_batcher(model, **kwargs):
+    kwargs.setdefault("length_buckets", [20])
+    return TranslationBatcher(model.translate_batch, **kwargs)
+
+
+async def with_ticker(coro):
+    """Run `coro` while measuring the worst event-loop stall"""
+    ticks, done = [], asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            ticks.append(time.perf_counter() - before)
+
+    task = asyncio.ensure_future(ticker())
+    try:
+        return await coro, max(ticks or [0.0])
+    finally:
+        done.set()
+        await task
+
+
+def test_mixed_traffic_is_grouped():
+    """One wait window of Hindi short/long and Tamil requests -> one batch per group"""
+    model = FakeModel()
+    requests = (
+        [(f"namaste {i}", "hin_Deva") for i in range(5)]
+        + [(f"yeh ek lamba vakya hai jo bucket badalta hai {i}", "hin_Deva") for i in range(3)]
+        + [(f"vanakkam {i}", "tam_Taml") for i in range(4)]
+    )
+
+    async def run():
+        batcher = make_batcher(model, max_batch_size=16, max_wait_ms=30)
+        results, worst_tick = await with_ticker(
+            asyncio.gather(*(batcher.translate(text, lang) for text, lang in requests))
+        )
+        return batcher, results, worst_tick
+
+    batcher, results, worst_tick = asyncio.run(run())
+    assert results == [f"en({text})" for text, _ in requests], results  # each caller got its own text back
+    assert sorted(model.batches) == [("hin_Deva", 3), ("hin_Deva", 5), ("tam_Taml", 4)], model.batches
+    assert worst_tick < MODEL_SECONDS, f"event loop blocked for {worst_tick:.3f}s"
+    assert batcher.stats()["avg_batch_size"] == 4.0
+    print(f"✅ 12 requests -> batches {sorted(model.batches)}; worst loop stall {worst_tick * 1000:.0f} ms")
+
+
+def test_full_queue_flushes_without_waiting():
+    """32 simultaneous requests with batch size 16 -> two batches, long before the 5 s window"""
+    model = FakeModel()
+
+    async def run():
+        batcher = make_batcher(model, max_batch_size=16, max_wait_ms=5000)
+        start = time.perf_counter()
+        results = await batcher.translate_many([f"text {i}" for i in range(32)], "hin_Deva")
+        return batcher, results, time.perf_counter() - start
+
+    batcher, results, elapsed = asyncio.run(run())
+    assert results == [f"en(text {i})" for i in range(32)]
+    assert model.batches == [("hin_Deva", 16), ("hin_Deva", 16)], model.batches
+    assert elapsed < 1, f"size flush waited {elapsed:.2f}s"
+    assert batcher.stats()["queue_depth"] == 0
+    print(f"✅ 32 requests -> 2 x 16 in {elapsed * 1000:.0f} ms (model time {2 * MODEL_SECONDS:.1f}s)")
+
+
+def test_lone_request_waits_one_window():
+    """A lone request pays at most max_wait_ms of batching delay; 0 disables the wait"""
+    for wait_ms in (50, 0):
+        model = FakeModel()
+
+        async def run():
+            batcher = make_batcher(model, max_batch_size=16, max_wait_ms=wait_ms)
+            start = time.perf_counter()
+            result = await batcher.translate("akela", "hin_Deva")
+            return batcher, result, time.perf_counter() - start - MODEL_SECONDS
+
+        batcher, result, delay = asyncio.run(run())
+        assert result == "en(akela)" and model.batches == [("hin_Deva", 1)]
+        assert batcher.max_wait == wait_ms / 1000
+        assert wait_ms / 1000 - 0.01 <= delay < wait_ms / 1000 + 0.05, f"batching delay {delay:.3f}s"
+        print(f"✅ max_wait_ms={wait_ms}: lone request flushed after {max(delay, 0) * 1000:.0f} ms")
+
+
+def test_failure_stays_in_its_batch():
+    """A crashing batch fails its own callers only"""
+    model = FakeModel(fail_lang="tam_Taml")
+
+    async def run():
+        batcher = make_batcher(model, max_batch_size=16, max_wait_ms=20)
+        calls = [batcher.translate("vanakkam", "tam_Taml"), batcher.translate("nandri", "tam_Taml"),
+                 batcher.translate("namaste", "hin_Deva")]
+        return batcher, await asyncio.gather(*calls, return_exceptions=True)
+
+    batcher, results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results[:2]), results
+    assert results[2] == "en(namaste)", results
+    assert batcher.stats()["errors"] == 1
+    print("✅ Tamil batch failure reached both Tamil callers; the Hindi batch succeeded")
+
+
+if __name__ == "__main__":
+    print("Testing translation micro-batching...")
+    print("=" * 50)
+    test_mixed_traffic_is_grouped()
+    test_full_queue_flushes_without_waiting()
+    test_lone_request_waits_one_window()
+    test_failure_stays_in_its_batch()
+    print("\n✅ Concurrent translations share model calls without stalling the loop")